@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+
+from tttcore.benchmark import DEFAULT_ROUNDS, DEFAULT_THRESHOLD, benchmark_cases, compare, run_benchmarks
+
+
+def print_report(report):
+    """
+    Prints one line per case of a benchmark report.
+
+    :param report: The report returned by run_benchmarks().
+    :return: None
+    """
+    print(f"{'case':<16}{'moves':>7}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>10}{'nodes/s':>12}"
+          f"{'peak KiB':>10}")
+    for name, case in report["cases"].items():
+        rate = f"{case['nodes_per_second']:.0f}" if case["nodes_per_second"] is not None else "-"
+        print(f"{name:<16}{case['moves']:>7}{case['p50_us']:>10.1f}{case['p90_us']:>10.1f}{case['p99_us']:>10.1f}"
+              f"{case['max_us']:>10.1f}{rate:>12}{case['peak_memory_bytes'] / 1024:>10.1f}")
+
+
+def print_comparison(rows, threshold):
+    """
+    Prints the changes between two reports and marks the regressions.
+
+    :param rows: The rows returned by compare().
+    :param threshold: The threshold the rows were compared with.
+    :return: The number of regressions.
+    """
+    print(f"{'case':<16}{'metric':<20}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, metric, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<16}{metric:<20}{old:>14.1f}{new:>14.1f}{change:>+10.1%}{flag}")
+    regressions = sum(row[5] for row in rows)
+    print(f"{regressions} regressions beyond {threshold:.0%}")
+    return regressions
+
+
+def load_report(path):
+    """
+    :param path: The filename of a JSON report.
+    :return: The report.
+    """
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main():
+    """
+    Runs the AI benchmarks, or compares two saved reports.
+
+    :return: The process exit code, 1 if a comparison found regressions.
+    """
+    parser = argparse.ArgumentParser(description="Measure the latency, search speed and memory of the Tic Tac Toe AI.")
+    parser.add_argument("-r", "--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="how often every case runs over its positions")
+    parser.add_argument("--case", action="append", choices=[case[0] for case in benchmark_cases()],
+                        help="a case to run, all of them by default; may be repeated")
+    parser.add_argument("-o", "--output", help="a file to write the JSON report to")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT",
+                        help="a baseline report to compare this run with, or a baseline and a current report to "
+                             "compare without running")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="the relative change beyond which a worse value is a regression")
+    args = parser.parse_args()
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one current report")
+
+    if args.compare and len(args.compare) == 2:
+        current = load_report(args.compare[1])
+    else:
+        current = run_benchmarks(args.rounds, args.case,
+                                 progress=lambda name: print(f"running {name}", file=sys.stderr, flush=True))
+        print_report(current)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(current, file, indent=2)
+
+    if args.compare:
+        print()
+        if print_comparison(compare(load_report(args.compare[0]), current, args.threshold), args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
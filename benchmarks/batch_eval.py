@@ -0,0 +1,107 @@
+"""
+Checks tttcore.batch.classify() against check_for_win() on all 19683 boards, and times both on the same boards.
+
+Legality and the player to move are checked against the set of positions reached by playing out every game from
+the empty board, once with 'X' and once with 'O' moving first.
+
+Usage:
+    python benchmarks/batch_eval.py [--size 1000000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tttcore import AI_MARKER, PLAYER_MARKER, Board, Game, opponent  # noqa: E402
+from tttcore import batch  # noqa: E402
+
+MARKER_VALUES = {PLAYER_MARKER: batch.X, AI_MARKER: batch.O}
+
+
+def reachable(first):
+    """
+    :param first: The marker of the player who moves first.
+    :return: A dictionary from the index of every position that can occur to the marker of the player to move, or
+    None if the game is over.
+    """
+    positions = {}
+    stack = [(Board(), first)]
+    while stack:
+        board, marker = stack.pop()
+        if board.index() in positions:
+            continue
+        if board.winner():
+            positions[board.index()] = None
+            continue
+        positions[board.index()] = marker
+        for cell in board.legal_moves():
+            child = board.copy()
+            child[cell] = marker
+            stack.append((child, opponent(marker)))
+    return positions
+
+
+def verify():
+    """
+    Compares every field of classify() for all boards with the single-board functions.
+
+    :return: None
+    """
+    boards = batch.all_boards()
+    game = Game(data_file=None)
+    for first in (PLAYER_MARKER, AI_MARKER):
+        result = batch.classify(boards, first)
+        positions = reachable(first)
+        for index in range(batch.BOARD_COUNT):
+            game.board = Board.from_cells(' XO'[value] for value in boards[index])
+            winner = game.check_for_win()
+            expected_moves = 0 if winner else game.board.empty_mask()
+            expected_to_move = MARKER_VALUES[positions[index]] if positions.get(index) else batch.NOBODY
+            actual = (batch.WINNER_RESULTS[result["winners"][index]], bool(result["terminal"][index]),
+                      int(result["moves"][index]), bool(result["legal"][index]), int(result["to_move"][index]))
+            expected = (winner, bool(winner), expected_moves, index in positions, expected_to_move)
+            if actual != expected:
+                raise AssertionError(f"{game.board!r} with {first} first: {actual} != {expected}")
+    print(f"classify() agrees with check_for_win() on all {batch.BOARD_COUNT} boards")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the batched board evaluation.")
+    parser.add_argument("--size", type=int, default=1000000, help="the number of boards to time")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of runs, of which the fastest is reported")
+    args = parser.parse_args()
+
+    verify()
+    rng = np.random.default_rng(0)
+    boards = batch.all_boards()[rng.integers(0, batch.BOARD_COUNT, args.size)]
+    batch.classify(boards[:1])
+
+    batch_time = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        batch.classify(boards)
+        batch_time = min(batch_time, time.perf_counter() - start)
+
+    game = Game(data_file=None)
+    start = time.perf_counter()
+    singles = [Board.from_cells(' XO'[value] for value in row) for row in boards.tolist()]
+    convert_time = time.perf_counter() - start
+    loop_time = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for board in singles:
+            game.board = board
+            game.check_for_win()
+        loop_time = min(loop_time, time.perf_counter() - start)
+
+    print(f"{args.size} boards: classify() {batch_time * 1000:.1f} ms, check_for_win() on the same boards "
+          f"{loop_time * 1000:.0f} ms, {loop_time / batch_time:.1f}x faster")
+    print(f"  (building the Boards from the array for the loop takes another {convert_time * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compares the throughput of tttcore.batch.ai_moves() with calling Game.ai_move() for every board of a batch, and checks
+that the moves agree.
+
+The batch is drawn from the positions of random games, so it holds many duplicate and symmetric boards like the
+positions of real games do. With exact moves the Hard AI has to return the same cells as ai_move(); with symmetric
+deduplication every cell has to have the same minimax score as the one ai_move() plays.
+
+Usage:
+    python benchmarks/batch_moves.py [--boards 100000] [--difficulty Hard]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from tttcore import Board, Game, engine  # noqa: E402
+from tttcore.batch import NO_MOVE, MARKERS, ai_moves, classify, from_boards  # noqa: E402
+
+
+def random_positions(count, seed):
+    """
+    :param count: The number of boards.
+    :param seed: The seed of the random games.
+    :return: A list of Boards taken from random games before their end, 'X' having moved first.
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = Board()
+        marker = 'X'
+        while not board.winner() and len(boards) < count:
+            boards.append(board.copy())
+            board[rng.choice([i for i in range(9) if board[i] == ' '])] = marker
+            marker = engine.opponent(marker)
+    return boards
+
+
+def loop_moves(boards, to_move, difficulty):
+    """
+    Plays ai_move() on a copy of every board.
+
+    :return: The list of cells played.
+    """
+    game = Game(difficulty, data_file=None)
+    moves = []
+    for board, mover in zip(boards, to_move):
+        game.board = board.copy()
+        moves.append(game.ai_move(MARKERS[mover]))
+    return moves
+
+
+def move_score(board, marker, move):
+    """
+    :return: The minimax score of playing move on board, from the point of view of marker.
+    """
+    board = board.copy()
+    board[move] = marker
+    winner = board.winner()
+    if winner:
+        return 0 if winner == 'Tie' else 1
+    return -engine.search(board, engine.opponent(marker)).score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time batched AI moves against a loop over ai_move().")
+    parser.add_argument("--boards", type=int, default=100000, help="the number of boards in the batch")
+    parser.add_argument("--difficulty", default="Hard", choices=("Easy", "Medium", "Hard"))
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random games")
+    args = parser.parse_args()
+
+    boards = random_positions(args.boards, args.seed)
+    batch = from_boards(boards)
+    to_move = classify(batch)["to_move"].tolist()
+    # Fills the lookup tables and the opening book, which every run after the first one finds ready
+    ai_moves(batch[:1], args.difficulty)
+    loop_moves(boards[:1], to_move[:1], args.difficulty)
+
+    start = time.perf_counter()
+    looped = loop_moves(boards, to_move, args.difficulty)
+    loop_time = time.perf_counter() - start
+    print(f"{len(boards)} boards, {len(np.unique(batch, axis=0))} distinct, difficulty {args.difficulty}")
+    print(f"{'method':<22}{'seconds':>10}{'boards/s':>12}{'speedup':>9}  agrees")
+    print(f"{'ai_move() loop':<22}{loop_time:>10.3f}{len(boards) / loop_time:>12.0f}{1:>9.2f}")
+
+    for name, symmetric in (("ai_moves() exact", False), ("ai_moves() symmetric", True)):
+        start = time.perf_counter()
+        moves = ai_moves(batch, args.difficulty, symmetric=symmetric, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        if args.difficulty != "Hard":
+            agrees = "-"
+        elif not symmetric:
+            agrees = "yes" if moves.tolist() == looped else "NO"
+        else:
+            scores = {}
+            agrees = "yes"
+            for board, mover, move, expected in zip(boards, to_move, moves.tolist(), looped):
+                if move == NO_MOVE:
+                    agrees = "NO"
+                    break
+                key = (board.index(), move, expected)
+                if key not in scores:
+                    marker = MARKERS[mover]
+                    scores[key] = move_score(board, marker, move) == move_score(board, marker, expected)
+                if not scores[key]:
+                    agrees = "NO"
+                    break
+        print(f"{name:<22}{elapsed:>10.3f}{len(boards) / elapsed:>12.0f}{loop_time / elapsed:>9.2f}  {agrees}")
+
+
+if __name__ == "__main__":
+    main()
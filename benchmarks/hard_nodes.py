@@ -0,0 +1,50 @@
+"""
+Compares the number of positions the Hard AI searches per move before and after alpha-beta pruning.
+
+The corpus is every position the AI ('O') can face after the player's first and second move. The former Hard AI ran
+one full minimax search per empty cell; the alpha-beta search is measured with and without its transposition table.
+
+Usage:
+    python benchmarks/hard_nodes.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tttcore import engine  # noqa: E402
+from minimax_nodes import count_nodes  # noqa: E402
+from tttcore.book import book_positions  # noqa: E402
+
+
+def minimax_nodes(board):
+    """
+    :param board: A Board with 'O' to move.
+    :return: The number of positions the former ai_move_hard visited, one full minimax tree per empty cell.
+    """
+    cells = list(board)
+    nodes = 0
+    for i in board.legal_moves():
+        cells[i] = 'O'
+        nodes += count_nodes(cells)
+        cells[i] = ' '
+    return nodes
+
+
+def main():
+    corpus = [board for board in book_positions() if board.x.bit_count() <= 2]
+    totals = [0, 0, 0]
+    print(f"{'position':<12}{'minimax':>10}{'alpha-beta':>12}{'+ table':>10}")
+    for board in corpus:
+        engine.alphabeta_table.clear()
+        counts = (minimax_nodes(board), engine.search(board, 'O', table=None).nodes,
+                  engine.search(board, 'O').nodes)
+        totals = [total + count for total, count in zip(totals, counts)]
+        print(f"{''.join(board).replace(' ', '.'):<12}{counts[0]:>10}{counts[1]:>12}{counts[2]:>10}")
+    print(f"{'total':<12}{totals[0]:>10}{totals[1]:>12}{totals[2]:>10}")
+    print(f"{len(corpus)} positions, alpha-beta visits {totals[0] / totals[1]:.0f}x fewer positions, "
+          f"{totals[0] / totals[2]:.0f}x fewer with the table")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Load-tests the game server on localhost and reports the latency percentiles of its answers.
+
+Every client opens one connection and sends its requests one after another. With --mode http these are POST /move
+requests over a keep-alive connection, each for a random position the AI can face; with --mode ws each client plays
+whole games in a WebSocket session, and every move is one request.
+
+Usage:
+    python benchmarks/load_test.py --spawn [--clients 50] [--requests 200] [--mode http|ws] [--difficulty Hard]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tttcore.benchmark import percentile  # noqa: E402
+from tttcore.book import book_positions  # noqa: E402
+from tttcore.rng import derive  # noqa: E402
+from tttcore.server import (DEFAULT_HOST, DEFAULT_PORT, OP_TEXT, encode_frame, read_message,  # noqa: E402
+                            websocket_accept)
+
+STARTUP_TIMEOUT = 10.0
+
+
+async def read_response(reader):
+    """
+    :return: A tuple of the HTTP status code and the decoded JSON body of a response.
+    """
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def http_client(host, port, args, rng, boards, latencies):
+    """
+    Sends args.requests move requests for random positions over one keep-alive connection.
+
+    :return: The number of failed requests.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    for _ in range(args.requests):
+        body = json.dumps({"board": rng.choice(boards), "difficulty": args.difficulty}).encode()
+        start = time.perf_counter()
+        writer.write(f"POST /move HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        status, _ = await read_response(reader)
+        latencies.append(time.perf_counter() - start)
+        errors += status != 200
+    writer.close()
+    return errors
+
+
+async def websocket_client(host, port, args, rng, latencies):
+    """
+    Plays games in one WebSocket session until args.requests moves were answered.
+
+    :return: The number of failed requests.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    key = "dGhlIHNhbXBsZSBub25jZQ=="
+    writer.write(f"GET /ws HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+    headers = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    if " 101 " not in headers.splitlines()[0] or websocket_accept(key) not in headers:
+        raise RuntimeError(f"WebSocket handshake failed: {headers.splitlines()[0]}")
+
+    mask = rng.randbytes(4)
+    errors = 0
+    state = None
+    for _ in range(args.requests):
+        if state is None or state.get("status") != "running":
+            message = {"type": "new", "difficulty": args.difficulty, "seed": rng.getrandbits(32)}
+        else:
+            message = {"type": "play", "cell": rng.choice([i for i, cell in enumerate(state["board"]) if cell == ' '])}
+        start = time.perf_counter()
+        writer.write(encode_frame(OP_TEXT, json.dumps(message).encode(), mask))
+        state = json.loads(await read_message(reader, writer, mask))
+        latencies.append(time.perf_counter() - start)
+        if state.get("type") == "error":
+            errors += 1
+            state = None
+    writer.close()
+    return errors
+
+
+def free_port():
+    """
+    :return: A port on localhost that nothing listens on right now.
+    """
+    with socket.socket() as sock:
+        sock.bind((DEFAULT_HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(host, port):
+    """
+    Waits until the server accepts connections.
+
+    :return: None
+    """
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def run(args):
+    """
+    Runs all clients at once and prints the latency report.
+
+    :return: None
+    """
+    await wait_until_up(args.host, args.port)
+    boards = [''.join(board) for board in book_positions()]
+    latencies = []
+    start = time.perf_counter()
+    if args.mode == "http":
+        clients = [http_client(args.host, args.port, args, derive(args.seed, client), boards, latencies)
+                   for client in range(args.clients)]
+    else:
+        clients = [websocket_client(args.host, args.port, args, derive(args.seed, client), latencies)
+                   for client in range(args.clients)]
+    errors = sum(await asyncio.gather(*clients))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} {args.difficulty} requests over {args.mode} from {args.clients} clients in "
+          f"{elapsed:.2f} s ({len(latencies) / elapsed:.0f} requests/s, {errors} errors)")
+    print(f"latency  p50 {percentile(latencies, 0.5) * 1000:.2f} ms  p90 {percentile(latencies, 0.9) * 1000:.2f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms  max {latencies[-1] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Tic Tac Toe game server.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="the address of the server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="the port of the server")
+    parser.add_argument("--spawn", action="store_true", help="start a server on a free port for the test")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="the search processes of a spawned server")
+    parser.add_argument("--clients", type=int, default=50, help="the number of concurrent connections")
+    parser.add_argument("--requests", type=int, default=200, help="the number of requests per client")
+    parser.add_argument("--mode", choices=("http", "ws"), default="http", help="the protocol to test")
+    parser.add_argument("--difficulty", choices=("Easy", "Medium", "Hard"), default="Hard")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the positions and moves sent")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        args.port = free_port()
+        command = [sys.executable, os.path.join(ROOT, "server.py"), "--host", args.host, "--port", str(args.port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
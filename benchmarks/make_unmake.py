@@ -0,0 +1,101 @@
+"""
+Compares how many positions per second a search visits when it checks every node with check_for_win() and when it
+makes and unmakes moves on a Position.
+
+Both searches walk the same full-width tree to a fixed depth and score the leaves with the line heuristic. The
+former approach marks a cell on the Board, calls winner(), which scans every line, and scans every line again to
+score a leaf. A Position only updates the lines through the cell played.
+
+Usage:
+    python benchmarks/make_unmake.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tttcore import Board, IterativeDeepeningSearch, Variant, opponent  # noqa: E402
+from tttcore.position import Position  # noqa: E402
+
+# (size, win length, depth, opening moves)
+CASES = (
+    (3, 3, 9, ()),
+    (4, 4, 5, ()),
+    (5, 4, 4, (12,)),
+    (15, 5, 2, (112, 113, 97)),
+)
+
+
+def rescan_negamax(board, marker, depth, evaluate):
+    """
+    Walks the tree the former way, checking every node with Board.winner().
+
+    :return: A tuple of the number of positions visited and the sum of the leaf scores.
+    """
+    nodes = 1
+    total = 0
+    if board.winner():
+        return nodes, total
+    if depth == 0:
+        return nodes, evaluate(board.mask(marker), board.mask(opponent(marker)))
+    for cell in board.legal_moves():
+        board[cell] = marker
+        child_nodes, child_total = rescan_negamax(board, opponent(marker), depth - 1, evaluate)
+        board[cell] = ' '
+        nodes += child_nodes
+        total += child_total
+    return nodes, total
+
+
+def incremental_negamax(position, depth, won=False):
+    """
+    Walks the same tree with make() and unmake().
+
+    :return: A tuple of the number of positions visited and the sum of the leaf scores.
+    """
+    nodes = 1
+    total = 0
+    if won or position.is_full():
+        return nodes, total
+    if depth == 0:
+        return nodes, position.evaluate()
+    free = position.empty_mask()
+    while free:
+        bit = free & -free
+        free ^= bit
+        won = position.make(bit.bit_length() - 1)
+        child_nodes, child_total = incremental_negamax(position, depth - 1, won)
+        position.unmake()
+        nodes += child_nodes
+        total += child_total
+    return nodes, total
+
+
+def main():
+    print(f"{'board':<22}{'depth':>6}{'nodes':>10}{'winner()/s':>13}{'make/s':>11}{'speedup':>9}")
+    for size, win_length, depth, opening in CASES:
+        variant = Variant.get(size, win_length)
+        board = Board(variant=variant)
+        marker = 'X'
+        for cell in opening:
+            board[cell] = marker
+            marker = opponent(marker)
+        evaluate = IterativeDeepeningSearch(variant).evaluate
+
+        start = time.perf_counter()
+        rescan = rescan_negamax(board.copy(), marker, depth, evaluate)
+        rescan_time = time.perf_counter() - start
+        start = time.perf_counter()
+        incremental = incremental_negamax(Position.from_board(board, marker), depth)
+        incremental_time = time.perf_counter() - start
+        if rescan != incremental:
+            raise AssertionError(f"{variant.name}: {rescan} != {incremental}")
+
+        nodes = rescan[0]
+        print(f"{variant.name:<22}{depth:>6}{nodes:>10}{nodes / rescan_time:>13.0f}{nodes / incremental_time:>11.0f}"
+              f"{rescan_time / incremental_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Reports the strength of the MCTS AI against the Hard AI for a growing budget of playouts per move, with and without
+the value table learned in self-play.
+
+The two AIs take turns in moving first. On 3x3 the Hard AI plays perfectly, so the best MCTS can do is draw every
+game; on larger boards Hard searches within --time-budget seconds per move.
+
+Usage:
+    python benchmarks/mcts_strength.py [--budgets 16 64 256 1000 4000] [--games 40] [--size 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tttcore import AI_MARKER, PLAYER_MARKER, Board, Game, Variant, opponent  # noqa: E402
+from tttcore.mcts import MonteCarloSearch, ValueTable, value_path  # noqa: E402
+
+
+def play_match(variant, playouts, table, games, time_budget, seed):
+    """
+    Plays MCTS against Hard.
+
+    :return: A tuple of a dictionary counting the 'Wins', 'Draws' and 'Losses' of MCTS, the seconds MCTS thought and
+    the number of MCTS moves.
+    """
+    search = MonteCarloSearch(variant, playouts, random.Random(seed), table)
+    hard = Game("Hard", data_file=None, size=variant.size, win_length=variant.win_length, time_budget=time_budget)
+    counts = {"Wins": 0, "Draws": 0, "Losses": 0}
+    thinking = 0.0
+    moves = 0
+    for number in range(games):
+        mcts_marker = PLAYER_MARKER if number % 2 == 0 else AI_MARKER
+        board = Board(variant=variant)
+        marker = PLAYER_MARKER
+        while not board.winner():
+            if marker == mcts_marker:
+                start = time.perf_counter()
+                board[search.search(board, marker).move] = marker
+                thinking += time.perf_counter() - start
+                moves += 1
+            else:
+                hard.board = board
+                hard.ai_move_hard(marker)
+            marker = opponent(marker)
+        winner = board.winner()
+        counts["Draws" if winner == 'Tie' else "Wins" if winner == mcts_marker else "Losses"] += 1
+    return counts, thinking, moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the strength of MCTS against Hard per playout budget.")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[16, 64, 256, 1000, 4000],
+                        help="the numbers of playouts per move to test")
+    parser.add_argument("--games", type=int, default=40, help="the number of games per budget")
+    parser.add_argument("--size", type=int, default=3, help="the number of rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=None, help="the number of marks in a row that win")
+    parser.add_argument("--time-budget", type=float, default=0.1, help="the seconds Hard may think on larger boards")
+    parser.add_argument("--table", default=value_path, help="the value table to test besides no table")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the MCTS playouts")
+    args = parser.parse_args()
+
+    variant = Variant.get(args.size, args.win_length)
+    tables = [("none", None)]
+    table = ValueTable.load(args.table)
+    if table is not None:
+        tables.append((f"{len(table)} positions", table))
+    else:
+        print(f"no value table at {args.table}, testing without one only")
+
+    print(f"MCTS against Hard on {variant.name}, {args.games} games per budget")
+    print(f"{'playouts':>9}  {'value table':<16}{'wins':>6}{'draws':>7}{'losses':>8}{'score':>8}{'ms/move':>9}"
+          f"{'playouts/ms':>13}")
+    for budget in args.budgets:
+        for name, table in tables:
+            counts, thinking, moves = play_match(variant, budget, table, args.games, args.time_budget, args.seed)
+            score = (counts["Wins"] + counts["Draws"] / 2) / args.games
+            milliseconds = thinking * 1000 / moves
+            print(f"{budget:>9}  {name:<16}{counts['Wins']:>6}{counts['Draws']:>7}{counts['Losses']:>8}{score:>8.1%}"
+                  f"{milliseconds:>9.2f}{budget / milliseconds:>13.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
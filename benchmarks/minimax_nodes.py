@@ -0,0 +1,160 @@
+"""
+Measures the cost of one minimax node on the bitboard engine against the former list-of-strings board.
+
+The list search and a plain bitboard negamax run without a transposition table and without shortcuts, so they visit
+the same game tree and the time per node can be compared directly. The engine's own search is timed as well: it
+detects the wins of a child in the parent and resolves the last two plies without further calls, so it makes far
+fewer calls than the tree has nodes. Its calls are counted, and its speedup is the one of a whole search.
+
+Usage:
+    python benchmarks/minimax_nodes.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tttcore import engine  # noqa: E402
+from tttcore.engine import FULL_MASK, MOVE_BITS, WINNING  # noqa: E402
+
+WIN_CONDITIONS = engine.WIN_CONDITIONS
+POSITIONS = {
+    "empty board": ' ' * 9,
+    "corner opening": 'X' + ' ' * 8,
+    "center opening": ' ' * 4 + 'X' + ' ' * 4,
+}
+
+
+def list_check_for_win(board):
+    """
+    The former TicTacToe.check_for_win, scanning the eight lines of a list of markers.
+    """
+    for each in WIN_CONDITIONS:
+        if board[each[0]] == board[each[1]] == board[each[2]] != ' ':
+            return board[each[0]]
+    if ' ' not in board:
+        return 'Tie'
+    return False
+
+
+def list_minimax(board, depth, isMaximizing):
+    """
+    The former TicTacToe.minimax on a list of markers.
+    """
+    winner = list_check_for_win(board)
+    if winner == 'O':
+        return 1
+    elif winner == 'X':
+        return -1
+    elif winner == 'Tie':
+        return 0
+
+    if isMaximizing:
+        best_score = float('-inf')
+        for i in range(len(board)):
+            if board[i] == ' ':
+                board[i] = 'O'
+                score = list_minimax(board, depth + 1, False)
+                board[i] = ' '
+                best_score = max(score, best_score)
+        return best_score
+    else:
+        best_score = float('inf')
+        for i in range(len(board)):
+            if board[i] == ' ':
+                board[i] = 'X'
+                score = list_minimax(board, depth + 1, True)
+                board[i] = ' '
+                best_score = min(score, best_score)
+        return best_score
+
+
+def bitboard_negamax(mover, waiting, free):
+    """
+    A negamax on the bitboards without the shortcuts of engine._negamax, visiting every node of the game tree.
+    """
+    if WINNING[waiting]:
+        return -1
+    if not free:
+        return 0
+    worst = 1
+    for bit in MOVE_BITS[free]:
+        score = bitboard_negamax(waiting, mover | bit, free ^ bit)
+        if score < worst:
+            worst = score
+    return -worst
+
+
+def count_calls(bitboard, is_maximizing):
+    """
+    :return: The number of calls of engine._negamax an uncached engine.minimax() makes on the Board.
+    """
+    search = engine._negamax
+    calls = 0
+
+    def counted(*args):
+        nonlocal calls
+        calls += 1
+        return search(*args)
+
+    engine._negamax = counted
+    try:
+        engine.minimax(bitboard, is_maximizing, table=None)
+    finally:
+        engine._negamax = search
+    return calls
+
+
+def count_nodes(board):
+    """
+    :param board: A list of markers with 'O' to move.
+    :return: The number of nodes a full minimax search from this board visits.
+    """
+    if list_check_for_win(board):
+        return 1
+    marker = 'O' if board.count('X') > board.count('O') else 'X'
+    nodes = 1
+    for i in range(9):
+        if board[i] == ' ':
+            board[i] = marker
+            nodes += count_nodes(board)
+            board[i] = ' '
+    return nodes
+
+
+def timed(function, repeat=3):
+    """
+    :return: The fastest of repeat runs of function, in seconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'':<16}{'same tree':>51}{'engine search':>49}")
+    print(f"{'position':<16}{'nodes':>10}{'list ns/node':>14}{'bitboard ns/node':>18}{'speedup':>9}"
+          f"{'calls':>10}{'ns/call':>9}{'speedup/call':>14}{'search speedup':>16}")
+    for name, cells in POSITIONS.items():
+        board = list(cells)
+        is_maximizing = board.count('X') > board.count('O')
+        nodes = count_nodes(board)
+        list_time = timed(lambda: list_minimax(board, 0, is_maximizing))
+        bitboard = engine.Board.from_cells(board)
+        mover = bitboard.mask('O' if is_maximizing else 'X')
+        waiting = bitboard.mask('X' if is_maximizing else 'O')
+        plain_time = timed(lambda: bitboard_negamax(mover, waiting, FULL_MASK ^ (mover | waiting)))
+        calls = count_calls(bitboard, is_maximizing)
+        engine_time = timed(lambda: engine.minimax(bitboard, is_maximizing, table=None))
+        list_node = list_time / nodes
+        print(f"{name:<16}{nodes:>10}{list_node * 1e9:>14.0f}{plain_time / nodes * 1e9:>18.0f}"
+              f"{list_time / plain_time:>8.1f}x{calls:>10}{engine_time / calls * 1e9:>9.0f}"
+              f"{list_node / (engine_time / calls):>13.1f}x{list_time / engine_time:>15.1f}x")
+
+
+if __name__ == "__main__":
+    main()
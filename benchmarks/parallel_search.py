@@ -0,0 +1,62 @@
+"""
+Compares the latency of the serial Hard search with the root-split ParallelSearch for a growing number of worker
+processes, and checks that both return the same move and score.
+
+Both search to a fixed depth without a time limit, so they have the same amount of work to do. The pool is started
+before the timing.
+
+Usage:
+    python benchmarks/parallel_search.py [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tttcore import Board, IterativeDeepeningSearch, Variant  # noqa: E402
+from tttcore.parallel import ParallelSearch  # noqa: E402
+
+# (name, size, win length, depth, cells of 'X')
+CASES = (
+    ("3x3 empty", 3, 3, 9, ()),
+    ("4x4 empty", 4, 4, 8, ()),
+    ("5x5 empty", 5, 4, 7, ()),
+    ("15x15 center", 15, 5, 7, (112,)),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the parallel Hard search against the serial one.")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="the worker counts to time, by default powers of two up to the number of cores")
+    args = parser.parse_args()
+    counts = args.workers or [1 << i for i in range(os.cpu_count().bit_length())]
+
+    print(f"{os.cpu_count()} cores")
+    print(f"{'position':<14}{'depth':>6}{'workers':>9}{'seconds':>10}{'speedup':>9}{'nodes':>10}  same move")
+    for name, size, win_length, depth, cells in CASES:
+        board = Board(variant=Variant.get(size, win_length))
+        for cell in cells:
+            board[cell] = 'X'
+        marker = 'O' if cells else 'X'
+
+        start = time.perf_counter()
+        serial = IterativeDeepeningSearch(board.variant, None, max_depth=depth).search(board, marker)
+        serial_time = time.perf_counter() - start
+        print(f"{name:<14}{depth:>6}{'serial':>9}{serial_time:>10.3f}{1:>9.2f}{serial.nodes:>10}")
+
+        for workers in counts:
+            with ParallelSearch(workers, None, depth) as search:
+                search.search(board, marker)
+                start = time.perf_counter()
+                result = search.search(board, marker)
+                elapsed = time.perf_counter() - start
+            same = "yes" if (result.move, result.score) == (serial.move, serial.score) else "NO"
+            print(f"{'':<14}{depth:>6}{workers:>9}{elapsed:>10.3f}{serial_time / elapsed:>9.2f}{result.nodes:>10}"
+                  f"  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measures how long tictactoe.py takes from the start of the Python process until its window is on the screen.
+
+Every run starts a fresh interpreter that imports tictactoe, creates the TicTacToe window and processes events until
+the window is mapped, then closes it. Without a display only the import is timed.
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--import-only]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child; prints the seconds from the parent's start time until the import finished and the window appeared
+CHILD = """
+import sys, time
+started = float(sys.argv[1])
+import tictactoe
+imported = time.time()
+if sys.argv[2] == 'window':
+    game = tictactoe.TicTacToe()
+    game.root.update()
+    while not game.root.winfo_ismapped():
+        game.root.update()
+    shown = time.time()
+    game.root.destroy()
+else:
+    shown = imported
+print(imported - started, shown - started)
+"""
+
+
+def has_display():
+    """
+    :return: True if Tk can open a window here.
+    """
+    result = subprocess.run([sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+                            capture_output=True)
+    return result.returncode == 0
+
+
+def measure(mode):
+    """
+    Starts one interpreter and times it.
+
+    :param mode: 'window' to wait for the window, 'import' to stop after the import.
+    :return: A tuple of the seconds until tictactoe was imported and until the window was shown.
+    """
+    output = subprocess.run([sys.executable, "-c", CHILD, repr(time.time()), mode], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    imported, shown = output.split()
+    return float(imported), float(shown)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the startup of the Tic Tac Toe window.")
+    parser.add_argument("--runs", type=int, default=10, help="the number of interpreters to start")
+    parser.add_argument("--import-only", action="store_true", help="only time the import, even with a display")
+    args = parser.parse_args()
+
+    mode = "window" if not args.import_only and has_display() else "import"
+    if mode == "import" and not args.import_only:
+        print("no display, timing the import only")
+    measure(mode)
+    runs = [measure(mode) for _ in range(args.runs)]
+    imports = [imported * 1000 for imported, _ in runs]
+    print(f"import tictactoe   median {statistics.median(imports):.0f} ms  min {min(imports):.0f} ms")
+    if mode == "window":
+        windows = [shown * 1000 for _, shown in runs]
+        print(f"window on screen   median {statistics.median(windows):.0f} ms  min {min(windows):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
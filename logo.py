@@ -1,48 +1,75 @@
-from PIL import Image, ImageDraw, ImageFilter
-
-# Create an empty square image with white color
-image_size = (300, 300)
-img = Image.new('RGB', image_size, color=(255, 255, 255))
-# Create Draw object
-draw = ImageDraw.Draw(img)
-
-# Create gradient
-top_color = (50, 50, 50)  # Dark grey
-bottom_color = (150, 150, 150)  # Light grey
-
-for y in range(image_size[1]):
-    for x in range(image_size[0]):
-        # Here we calculate the ratio of the current y / height of the image
-        r = float(y) / image_size[1]
-        r = r ** 0.2  # You can tweak this exponent to get different curves for the gradient
-        color = tuple([int(r * top_color[i] + (1-r) * bottom_color[i]) for i in range(3)])
-        draw.point((x, y), fill=color)
-
-# Draw the grid
-line_color = (70, 130, 180, 255)
-line_width = 3
-draw = ImageDraw.Draw(img, 'RGBA')
-
-for i in range(1, 3):
-    # Vertical lines
-    start_point = (i * image_size[0] // 3, 0)
-    end_point = (i * image_size[0] // 3, image_size[1])
-    draw.line([start_point, end_point], fill=line_color, width=line_width)
-
-    # Horizontal lines
-    start_point = (0, i * image_size[1] // 3)
-    end_point = (image_size[0], i * image_size[1] // 3)
-    draw.line([start_point, end_point], fill=line_color, width=line_width)
-
-# Create a circular mask image
-mask = Image.new('L', image_size)
-mask_draw = ImageDraw.Draw(mask)
-mask_draw.ellipse((0, 0) + image_size, fill=255)
-
-# Applied mask to original image
-img.putalpha(mask)
-
-# Save the image
-img.save('img/logo.png')
-img.resize((32,32))
-img.save('img/logo.ico', format='ICO')
+import argparse
+import os
+
+from PIL import Image, ImageDraw
+
+# The size of img/logo.png, and the sizes stored in img/logo.ico, each drawn at its own resolution
+LOGO_SIZE = 300
+ICON_SIZES = (16, 24, 32, 48, 64, 128, 256)
+
+TOP_COLOR = (50, 50, 50)  # Dark grey
+BOTTOM_COLOR = (150, 150, 150)  # Light grey
+# The exponent of the gradient curve; lower values keep the light grey further down
+GRADIENT_EXPONENT = 0.2
+LINE_COLOR = (70, 130, 180, 255)
+# The width of the grid lines at LOGO_SIZE; other sizes scale it
+LINE_WIDTH = 3
+
+
+def gradient_rows(height):
+    """
+    :param height: The height of the image in pixels.
+    :return: The color of every row of the gradient, from the top.
+    """
+    rows = []
+    for y in range(height):
+        r = (float(y) / height) ** GRADIENT_EXPONENT
+        rows.append(bytes(int(r * TOP_COLOR[i] + (1 - r) * BOTTOM_COLOR[i]) for i in range(3)))
+    return rows
+
+
+def draw_logo(size):
+    """
+    Draws the logo: a circle with a grey gradient and the blue Tic Tac Toe grid.
+
+    The gradient is computed once per row and the image is built from whole rows, instead of drawing every pixel.
+
+    :param size: The width and height of the image in pixels.
+    :return: The RGBA Image.
+    """
+    width = height = size
+    img = Image.frombytes('RGB', (width, height), b''.join(row * width for row in gradient_rows(height)))
+
+    draw = ImageDraw.Draw(img, 'RGBA')
+    line_width = max(1, round(LINE_WIDTH * size / LOGO_SIZE))
+    for i in range(1, 3):
+        draw.line([(i * width // 3, 0), (i * width // 3, height)], fill=LINE_COLOR, width=line_width)
+        draw.line([(0, i * height // 3), (width, i * height // 3)], fill=LINE_COLOR, width=line_width)
+
+    mask = Image.new('L', (width, height))
+    ImageDraw.Draw(mask).ellipse((0, 0, width, height), fill=255)
+    img.putalpha(mask)
+    return img
+
+
+def main():
+    """
+    Draws img/logo.png and img/logo.ico.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Draw the Tic Tac Toe logo and window icon.")
+    parser.add_argument("--size", type=int, default=LOGO_SIZE, help="the width and height of logo.png")
+    parser.add_argument("--icon-sizes", type=int, nargs="+", default=ICON_SIZES, help="the sizes stored in logo.ico")
+    parser.add_argument("--output", default="img", help="the directory to write the images to")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    draw_logo(args.size).save(os.path.join(args.output, 'logo.png'))
+    icons = [draw_logo(size) for size in sorted(args.icon_sizes, reverse=True)]
+    icons[0].save(os.path.join(args.output, 'logo.ico'), format='ICO', sizes=[icon.size for icon in icons],
+                  append_images=icons[1:])
+
+
+if __name__ == "__main__":
+    main()
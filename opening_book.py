@@ -0,0 +1,36 @@
+import sys
+
+from tttcore import AI_MARKER, best_move
+from tttcore.book import OpeningBook, book_path, book_positions
+
+
+def main():
+    """
+    Generates the opening book from the Hard AI search, or verifies the shipped one with --verify.
+
+    :return: The process exit code.
+    """
+    def solve(board):
+        return best_move(board, AI_MARKER)
+
+    if '--verify' in sys.argv[1:]:
+        book = OpeningBook.load()
+        if book is None:
+            print(f"No valid opening book at {book_path}")
+            return 1
+    else:
+        book = OpeningBook.generate(solve)
+
+    mismatches = book.verify(solve)
+    if mismatches:
+        print(f"Opening book disagrees with the Hard AI search on {len(mismatches)} positions")
+        return 1
+    if '--verify' not in sys.argv[1:]:
+        book.save()
+        print(f"Wrote {book_path}")
+    print(f"Opening book agrees with the Hard AI search on all {len(book_positions())} positions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
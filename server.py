@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import signal
+import sys
+
+from tttcore.deepening import DEFAULT_TIME_BUDGET
+from tttcore.server import DEFAULT_HOST, DEFAULT_PORT, GameServer
+
+
+async def serve(args):
+    """
+    Runs the game server until it is interrupted or terminated.
+
+    :param args: The parsed command line.
+    :return: None
+    """
+    server = GameServer(args.host, args.port, args.workers, args.time_budget)
+    await server.start()
+    print(f"Serving AI moves on http://{server.host}:{server.port} (POST /move, GET /health, WebSocket /ws)",
+          flush=True)
+    # Cancelling the task on SIGTERM runs the cleanup of serve_forever(), which stops the search processes
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass  # Windows, where the event loop cannot handle signals
+    try:
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+
+
+def main():
+    """
+    Starts the AI game server.
+
+    :return: The process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Serve Tic Tac Toe AI moves over HTTP and WebSocket.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="the address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="the port to listen on, 0 for a free one")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="the number of search processes")
+    parser.add_argument("--time-budget", type=float, default=DEFAULT_TIME_BUDGET,
+                        help="the seconds a Hard search may take on boards larger than 3x3")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
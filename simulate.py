@@ -0,0 +1,47 @@
+import argparse
+import sys
+import time
+
+from tttcore.history import HistoryWriter
+from tttcore.simulation import POLICIES, simulate
+
+
+def main():
+    """
+    Plays a tournament between two AI policies and prints the running win/loss/draw table.
+
+    :return: The process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Let two Tic Tac Toe AI policies play against each other.")
+    parser.add_argument("policy_a", choices=POLICIES, help="the policy playing 'X'")
+    parser.add_argument("policy_b", choices=POLICIES, help="the policy playing 'O'")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="the number of games to play")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="the number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="the base seed of the random number generators")
+    parser.add_argument("--alternate", action="store_true", help="let the policies take turns in moving first")
+    parser.add_argument("--history", help="a file to append the moves of every game to")
+    args = parser.parse_args()
+    history = HistoryWriter(args.history, flush_every=100000) if args.history else None
+
+    label_a = f"{args.policy_a} (X)"
+    label_b = f"{args.policy_b} (O)"
+    print(f"{'games':>10}{label_a:>16}{label_b:>16}{'draws':>10}{'games/s':>10}")
+    start = time.perf_counter()
+    totals = None
+    for totals in simulate(args.policy_a, args.policy_b, args.games, args.workers, args.seed, args.alternate,
+                           history=history):
+        played = sum(totals.values())
+        rate = played / (time.perf_counter() - start)
+        print(f"{played:>10}{totals['A']:>16}{totals['B']:>16}{totals['Draws']:>10}{rate:>10.0f}", flush=True)
+
+    if history is not None:
+        history.close()
+    if totals:
+        played = sum(totals.values())
+        print(f"{'share':>10}{totals['A'] / played:>16.1%}{totals['B'] / played:>16.1%}"
+              f"{totals['Draws'] / played:>10.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
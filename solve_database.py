@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+from tttcore import Board, Variant
+from tttcore.database import OUTCOME_NAMES, OutcomeDatabase, database_path
+from tttcore.retrograde import CHUNK_SIZE, solve
+
+
+def main():
+    """
+    Solves every position of a board by retrograde analysis and writes the win/draw/loss database the Hard AI reads,
+    reporting the progress and the memory in use while it runs.
+
+    :return: The process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Write the win/draw/loss database of a Tic Tac Toe board.")
+    parser.add_argument("--size", type=int, default=3, help="the number of rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=None, help="the number of marks in a row that win")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="the number of positions solved at a time")
+    parser.add_argument("-o", "--output", default=None, help="the database file, by default the one the game reads")
+    args = parser.parse_args()
+
+    variant = Variant.get(args.size, args.win_length)
+    path = args.output or database_path(variant)
+    positions = 3 ** variant.cells
+    print(f"Solving {positions} positions of {variant.name} into {path}")
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    def progress(solved, total):
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"{solved / total:7.1%}  {solved:>11} positions  {solved / elapsed / 1e6:6.2f} M/s  "
+              f"memory {current / 1e6:6.1f} MB (peak {peak / 1e6:.1f} MB)  database {total / 1e6:.1f} MB mapped",
+              flush=True)
+
+    try:
+        solve(variant, path, args.chunk_size, progress)
+    except ValueError as error:
+        print(error)
+        return 1
+    print(f"Wrote {os.path.getsize(path)} bytes in {time.perf_counter() - start:.1f} s")
+
+    with OutcomeDatabase.open(variant, path) as database:
+        outcome, distance = database.lookup(Board(variant=variant), 'X')
+    print(f"The empty board is a {OUTCOME_NAMES[outcome]} for the first player in {distance} plies")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
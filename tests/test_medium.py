@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from tttcore import Board, Game, opponent
+
+
+def probe_move(board, marker):
+    """
+    The former Medium AI without its random fallback: tries every empty cell for a win of marker, then for a win of
+    the opponent.
+
+    :return: The cell, or None if the former AI would have drawn a random cell.
+    """
+    wins_with = board.variant.wins_with
+    for mask in (board.mask(marker), board.mask(opponent(marker))):
+        for cell in board.legal_moves():
+            if wins_with(mask | 1 << cell, cell):
+                return cell
+    return None
+
+
+def reachable_positions():
+    """
+    :return: A list of (Board, marker to move) for every unfinished 3x3 position, with either player moving first.
+    """
+    positions = []
+    seen = set()
+    stack = [(Board(), 'X'), (Board(), 'O')]
+    while stack:
+        board, marker = stack.pop()
+        if (board.x, board.o, marker) in seen or board.winner():
+            continue
+        seen.add((board.x, board.o, marker))
+        positions.append((board, marker))
+        for cell in board.legal_moves():
+            child = board.copy()
+            child[cell] = marker
+            stack.append((child, opponent(marker)))
+    return positions
+
+
+def random_positions(size, win_length, count, seed):
+    """
+    :return: A list of (Board, marker to move) taken from random games before their end.
+    """
+    rng = random.Random(seed)
+    game = Game(data_file=None, size=size, win_length=win_length)
+    positions = []
+    while len(positions) < count:
+        board = Board(variant=game.variant)
+        marker = 'X'
+        for _ in range(rng.randrange(game.variant.cells)):
+            board[rng.choice(board.legal_moves())] = marker
+            marker = opponent(marker)
+            if board.winner():
+                break
+        if not board.winner():
+            positions.append((board, marker))
+    return positions
+
+
+class MediumTest(unittest.TestCase):
+
+    def check_positions(self, positions):
+        game = Game("Medium", data_file=None, size=positions[0][0].variant.size,
+                    win_length=positions[0][0].variant.win_length, seed=0)
+        for board, marker in positions:
+            game.board = board.copy()
+            expected = probe_move(board, marker)
+            move = game.ai_move(marker)
+            if expected is not None:
+                self.assertEqual(move, expected, f"{board!r} with {marker} to move")
+            else:
+                self.assertEqual(board[move], ' ', f"{board!r} with {marker} to move")
+
+    def test_classic_wins_and_blocks_match_the_probe_loops(self):
+        self.check_positions(reachable_positions())
+
+    def test_large_board_wins_and_blocks_match_the_probe_loops(self):
+        self.check_positions(random_positions(5, 4, 500, 1))
+        self.check_positions(random_positions(15, 5, 200, 2))
+
+    def test_fixed_seed_plays_the_same_games(self):
+        def play(seed):
+            game = Game("Medium", data_file=None, seed=seed)
+            games = []
+            for number in range(50):
+                game.reset_game()
+                marker = 'XO'[number % 2]
+                while not game.check_for_win():
+                    game.ai_move(marker)
+                    marker = opponent(marker)
+                games.append(list(game.moves))
+            return games
+
+        self.assertEqual(play(5), play(5))
+        self.assertNotEqual(play(5), play(6))
+
+
+if __name__ == '__main__':
+    unittest.main()
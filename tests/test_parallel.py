@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from tttcore import Board, IterativeDeepeningSearch, Variant, opponent
+from tttcore.parallel import ParallelSearch
+
+
+def random_position(variant, plies, rng, near_center=None):
+    """
+    :param near_center: Only marks cells at most this many rows and columns from the center, or None for any cell.
+    :return: A tuple of an unfinished Board after up to plies random moves and the marker to move, or None.
+    """
+    board = Board(variant=variant)
+    center = variant.size // 2
+    marker = 'X'
+    for _ in range(plies):
+        cells = board.legal_moves()
+        if near_center is not None:
+            cells = [cell for cell in cells
+                     if abs(cell // variant.size - center) <= near_center
+                     and abs(cell % variant.size - center) <= near_center]
+        board[rng.choice(cells)] = marker
+        marker = opponent(marker)
+        if board.winner():
+            return None
+    return board, marker
+
+
+class ParallelSearchTest(unittest.TestCase):
+
+    def test_same_move_and_score_as_serial(self):
+        rng = random.Random(1)
+        cases = [(Variant.get(4, 4), 4, None), (Variant.get(5, 4), 3, None), (Variant.get(15, 5), 2, 2)]
+        compared = 0
+        with ParallelSearch(workers=2, time_budget=None) as parallel:
+            for variant, depth, near_center in cases:
+                parallel.max_depth = depth
+                for _ in range(8):
+                    position = random_position(variant, rng.randrange(1, 7), rng, near_center)
+                    if position is None:
+                        continue
+                    board, marker = position
+                    serial = IterativeDeepeningSearch(variant, None, max_depth=depth).search(board, marker)
+                    result = parallel.search(board, marker)
+                    self.assertEqual((result.move, result.score), (serial.move, serial.score),
+                                     f"{board!r} with {marker} to move, depth {depth}")
+                    compared += 1
+        self.assertGreater(compared, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
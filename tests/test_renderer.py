@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from tictactoe import BoardRenderer
+from tttcore import Board, Variant, opponent
+
+
+class FakeCanvas:
+    """
+    Keeps the items a Tkinter canvas would hold, so a board can be drawn without a display.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self._next_id = 1
+
+    def _create(self, kind, options):
+        item = self._next_id
+        self._next_id += 1
+        self.items[item] = dict(options, kind=kind)
+        return item
+
+    def create_rectangle(self, *coordinates, **options):
+        return self._create('rectangle', options)
+
+    def create_text(self, *coordinates, **options):
+        return self._create('text', options)
+
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+
+    def find_all(self):
+        return tuple(self.items)
+
+
+class BoardRendererTest(unittest.TestCase):
+
+    def play_games(self, renderer, variant, games, seed):
+        """
+        Renders every position of random games, and the empty board after each game, like the window does.
+        """
+        rng = random.Random(seed)
+        counts = set()
+        for _ in range(games):
+            board = Board(variant=variant)
+            marker = 'X'
+            renderer.render(board)
+            while not board.winner():
+                board[rng.choice(board.legal_moves())] = marker
+                marker = opponent(marker)
+                renderer.render(board)
+                counts.add(renderer.item_count())
+        renderer.render(Board(variant=variant))
+        counts.add(renderer.item_count())
+        return counts
+
+    def test_item_count_stays_constant(self):
+        for size, win_length in ((3, 3), (4, 4), (5, 4)):
+            variant = Variant.get(size, win_length)
+            canvas = FakeCanvas()
+            renderer = BoardRenderer(canvas, size)
+            self.assertEqual(renderer.item_count(), 2 * variant.cells)
+            self.assertEqual(self.play_games(renderer, variant, 50, size), {2 * variant.cells})
+
+    def test_only_changed_cells_are_updated(self):
+        canvas = FakeCanvas()
+        renderer = BoardRenderer(canvas)
+        board = Board()
+        self.assertEqual(renderer.render(board), 0)
+        board[4] = 'X'
+        self.assertEqual(renderer.render(board), 1)
+        self.assertEqual(renderer.render(board), 0)
+        board[0] = 'O'
+        self.assertEqual(renderer.render(board), 1)
+        texts = [item['text'] for item in canvas.items.values() if item['kind'] == 'text']
+        self.assertEqual(texts, ['O', '', '', '', 'X', '', '', '', ''])
+        self.assertEqual(renderer.render(Board()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
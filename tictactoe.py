@@ -1,26 +1,21 @@
-import json
 import os
-import random
 import sys
 import time
 import tkinter as tk
-import webbrowser
 from tkinter import messagebox
 import ttkbootstrap as ttk
-from ttkbootstrap import SUCCESS, WARNING, DANGER
+from ttkbootstrap import SUCCESS, WARNING, DANGER, INFO
+
+from tttcore import Game, PLAYER_MARKER, AI_MARKER, VARIANTS
 
 # self-written for showing the icon in the taskbar
-import ctypes
+if sys.platform == 'win32':
+    import ctypes
 
-myappid = 'miku.ai.tictactoe.1.0'
-ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
+    myappid = 'miku.ai.tictactoe.1.0'
+    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
 # self-written end
 
-PLAYER_MARKER = 'X'
-AI_MARKER = 'O'
-EMPTY_MARKER = ' '
-WIN_CONDITIONS = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
-
 if getattr(sys, 'frozen', False):
     base_dir = sys._MEIPASS
 else:
@@ -29,25 +24,108 @@ else:
 logo_png_path = os.path.join(base_dir, 'img', 'logo.png')
 logo_ico_path = os.path.join(base_dir, 'img', 'logo.ico')
 
+# The least time between the player's move and the AI's answer, and how often a running AI move is checked
+AI_DELAY_MS = 500
+AI_POLL_MS = 10
+# Cells shrink from 100 pixels on the 3x3 board so that the board stays about 300 pixels wide, down to MIN_CELL_SIZE
+BOARD_PIXELS = 300
+MIN_CELL_SIZE = 40
+CELL_SIZE = BOARD_PIXELS // 3
+MARKER_COLORS = {PLAYER_MARKER: 'blue', AI_MARKER: 'red'}
+# Names a JSON lines file that records every AI move of the session, see tttcore.instrument
+TRACE_ENVIRONMENT_VARIABLE = 'TTT_TRACE'
+
+
+def open_link(url):
+    """
+    Opens a web page in the browser. webbrowser is imported on the first call only, as it takes longer to import
+    than most of the window.
+
+    :param url: The address of the page.
+    :return: None
+    """
+    import webbrowser
+    webbrowser.open_new(url)
+
+
+def cell_size_for(size):
+    """
+    :param size: The number of rows and columns of the board.
+    :return: The width and height of a cell in pixels.
+    """
+    return max(MIN_CELL_SIZE, BOARD_PIXELS // size)
+
 
-class TicTacToe:
+class BoardRenderer:
     """
-     A class representing the Tic Tac Toe game.
+    Draws a board on a canvas, creating the grid once and afterwards only changing the cells that changed.
+
+    Attributes:
+    - canvas: The Tkinter canvas the board is drawn on
+    - size: The number of rows and columns of the board
+    - cell_size: The width and height of a cell in pixels
+    """
+
+    def __init__(self, canvas, size=3, cell_size=CELL_SIZE):
+        """
+        :param canvas: The Tkinter canvas to draw on.
+        :param size: The number of rows and columns of the board.
+        :param cell_size: The width and height of a cell in pixels.
+        """
+        self.canvas = canvas
+        self.size = size
+        self.cell_size = cell_size
+        self._texts = []
+        self._shown = []
+        for i in range(size):
+            for j in range(size):
+                canvas.create_rectangle(j * cell_size, i * cell_size, j * cell_size + cell_size,
+                                        i * cell_size + cell_size, outline='black')
+                self._texts.append(canvas.create_text(j * cell_size + cell_size // 2, i * cell_size + cell_size // 2,
+                                                      text='', font=('Arial', cell_size // 2)))
+                self._shown.append(' ')
+
+    def render(self, board):
+        """
+        Updates the text items of the cells whose marker differs from what is shown.
+
+        :param board: The Board to show.
+        :return: The number of cells that were updated.
+        """
+        updated = 0
+        for i, marker in enumerate(board):
+            if marker != self._shown[i]:
+                self.canvas.itemconfigure(self._texts[i], text=marker.strip(), fill=MARKER_COLORS.get(marker, ''))
+                self._shown[i] = marker
+                updated += 1
+        return updated
+
+    def item_count(self):
+        """
+        :return: The number of items on the canvas, which stays the same until the board size changes.
+        """
+        return len(self.canvas.find_all())
+
+
+class TicTacToe(Game):
+    """
+     A class representing the Tic Tac Toe game window, a front end over the Game core.
 
      Attributes:
      - root: The Tkinter root window
-     - data_file: The filename of the JSON file to store game statistics
-     - difficulty: The difficulty level of the AI player ('Easy', 'Medium', or 'Hard')
-     - board: A list representing the Tic Tac Toe board
-     - statistics: A dictionary containing game statistics
+     - canvas: The canvas the board is drawn on
+     - renderer: The BoardRenderer keeping the canvas in sync with the board
+     - style: The ttkbootstrap style of the window
+     - ai_delay: The least time in milliseconds between the player's move and the AI's answer
+     - ai_thinking: True while an AI move is being computed; clicks on the board are ignored meanwhile
+     - ai_executor: The single worker thread computing AI moves, started with the first AI move
+     - board, variant, difficulty, statistics, data_file, last_search, last_source: See tttcore.Game
 
      Methods:
      - __init__(self): Initializes the TicTacToe class, creates the game window, and sets up the menu
      - initialize_menu(self): Initializes the menu options for the game
      - show_info(self): Displays information about the game
-     - reset_statistics(self): Resets the game statistics to default
-     - load_data(self): Loads the game statistics from a JSON file
-     - save_data(self): Saves the game statistics to a JSON file
+     - reset_statistics(self): Asks for confirmation and resets the game statistics to default
     """
 
     def __init__(self):
@@ -60,16 +138,20 @@ class TicTacToe:
         Returns:
             None
         """
+        super().__init__(history_file="ttthistory.bin", trace_file=os.environ.get(TRACE_ENVIRONMENT_VARIABLE))
+        self.ai_delay = AI_DELAY_MS
+        self.ai_thinking = False
+        self._ai_executor = None
+        self._game_number = 0
+        self._images = {}
         self.root = tk.Tk()
-        self.root.iconbitmap(logo_ico_path)
-        self.data_file = "tttdata.json"
-        self.difficulty = "Easy"
-        self.board = [' ' for _ in range(9)]
-        self.statistics = self.load_data()
+        # The icon is decoded once the window is up instead of before it can appear
+        self.root.after_idle(self.root.iconbitmap, logo_ico_path)
 
         self.style = ttk.Style("superhero")
-        self.canvas = tk.Canvas(self.root, width=300, height=300)
-        self.root.title(f"Tic Tac Toe - {self.difficulty}")
+        self.canvas = tk.Canvas(self.root, width=3 * CELL_SIZE, height=3 * CELL_SIZE)
+        self.renderer = BoardRenderer(self.canvas)
+        self.update_title()
 
         self.initialize_menu()
 
@@ -79,6 +161,32 @@ class TicTacToe:
         self.draw_board()
         self.center_window()
 
+    @property
+    def ai_executor(self):
+        """
+        :return: The ThreadPoolExecutor computing AI moves; it and concurrent.futures are loaded on first use.
+        """
+        if self._ai_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._ai_executor = ThreadPoolExecutor(max_workers=1)
+        return self._ai_executor
+
+    def load_image(self, path, subsample=1):
+        """
+        Decodes an image file on first use and keeps it, so windows opened again show the same PhotoImage.
+
+        :param path: The filename of the image.
+        :param subsample: The factor the image is shrunk by.
+        :return: The tk.PhotoImage.
+        """
+        image = self._images.get((path, subsample))
+        if image is None:
+            image = tk.PhotoImage(file=path)
+            if subsample != 1:
+                image = image.subsample(subsample)
+            self._images[path, subsample] = image
+        return image
+
     def initialize_menu(self):
         """
         Initialize the menu for the TicTacToe game.
@@ -90,6 +198,10 @@ class TicTacToe:
         game_menu = tk.Menu(menubar, tearoff=0)
         game_menu.add_command(label="Modify Difficulty Level", command=self.show_difficulty_selection)
         game_menu.add_command(label="Reset Game", command=self.reset_game)
+        size_menu = tk.Menu(game_menu, tearoff=0)
+        for name, (size, win_length) in VARIANTS.items():
+            size_menu.add_command(label=name, command=lambda s=size, k=win_length: self.set_variant(s, k))
+        game_menu.add_cascade(label="Board Size", menu=size_menu)
         menubar.add_cascade(label="Game", menu=game_menu)
 
         stats_menu = tk.Menu(menubar, tearoff=0)
@@ -128,8 +240,7 @@ class TicTacToe:
         info_window.title("About this project")
         info_window.iconbitmap(logo_ico_path)
 
-        img = tk.PhotoImage(file=logo_png_path)
-        img = img.subsample(3)
+        img = self.load_image(logo_png_path, 3)
 
         panel = tk.Label(info_window, image=img)
         panel.image = img
@@ -140,50 +251,18 @@ class TicTacToe:
         text = tk.Label(info_window, text=message, justify='left')
         link = "https://github.com/princessmiku/TicTacToeAI"
         link_label = tk.Label(info_window, text=link, fg="blue", cursor="hand2")
-        link_label.bind("<Button-1>", lambda e: webbrowser.open_new(link))
+        link_label.bind("<Button-1>", lambda e: open_link(link))
         text.grid(row=0, column=1, sticky='w')
         link_label.grid(row=1, column=1, sticky='w')
 
     def reset_statistics(self):
         """
-        Resets the statistics for the TicTacToe game.
+        Resets the statistics for the TicTacToe game after asking for confirmation.
 
         :return: None
         """
         if messagebox.askyesno('Confirm Reset', 'Are you sure you want to reset the statistics?'):
-            self.statistics = {
-                "Easy": {"Wins": 0, "Losses": 0, "Draws": 0},
-                "Medium": {"Wins": 0, "Losses": 0, "Draws": 0},
-                "Hard": {"Wins": 0, "Losses": 0, "Draws": 0}
-            }
-            self.save_data()
-
-    def load_data(self):
-        """
-        Loads the game statistics from a JSON file.
-
-        :return: A dictionary containing the game statistics.
-        """
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                return data["statistics"]
-        except FileNotFoundError:
-            return {
-                "Easy": {"Wins": 0, "Losses": 0, "Draws": 0},
-                "Medium": {"Wins": 0, "Losses": 0, "Draws": 0},
-                "Hard": {"Wins": 0, "Losses": 0, "Draws": 0}
-            }
-
-    def save_data(self):
-        """
-        Save the data of TicTacToe game.
-
-        :return: None
-        """
-        data = {"statistics": self.statistics}
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f)
+            super().reset_statistics()
 
     def set_difficulty(self, value):
         """
@@ -200,39 +279,48 @@ class TicTacToe:
             game = TicTacToe()
             game.set_difficulty('easy')
         """
-        self.difficulty = value
-        self.root.title(f"Tic Tac Toe - {self.difficulty}")
-        self.reset_game()
+        super().set_difficulty(value)
+        self.update_title()
 
-    def draw_board(self):
+    def set_variant(self, size, win_length=None):
         """
-        Draws the Tic-Tac-Toe board on the canvas.
+        Changes the board size and win length, starts a new game and resizes the window to the new board.
 
+        :param size: The number of rows and columns of the board.
+        :param win_length: The number of marks in a row that win, by default the size.
         :return: None
         """
-        for i in range(3):
-            for j in range(3):
-                self.canvas.create_rectangle(j * 100, i * 100, j * 100 + 100, i * 100 + 100, outline='black')
-                if self.board[i * 3 + j] == 'X':
-                    self.canvas.create_text(j * 100 + 50, i * 100 + 50, text=self.board[i * 3 + j], font=('Arial', 50),
-                                            fill='blue')
-                elif self.board[i * 3 + j] == 'O':
-                    self.canvas.create_text(j * 100 + 50, i * 100 + 50, text=self.board[i * 3 + j], font=('Arial', 50),
-                                            fill='red')
+        super().set_variant(size, win_length)
+        self.update_title()
+        # Let the window take the size of the new canvas again before centering it
+        self.root.geometry('')
+        self.center_window()
 
-    def check_for_win(self):
+    def update_title(self):
         """
-        Checks if there is a winner or a tie in the Tic Tac Toe game.
+        Shows the difficulty level, and the board if it is not 3x3, in the window title.
 
-        :return: Returns the marker of the winner if there is a winner, 'Tie' if the game is tied, or False if there
-        is no winner yet.
+        :return: None
         """
-        for each in WIN_CONDITIONS:
-            if self.board[each[0]] == self.board[each[1]] == self.board[each[2]] != EMPTY_MARKER:
-                return self.board[each[0]]
-        if EMPTY_MARKER not in self.board:
-            return 'Tie'
-        return False
+        if self.variant.size == 3:
+            self.root.title(f"Tic Tac Toe - {self.difficulty}")
+        else:
+            self.root.title(f"Tic Tac Toe - {self.difficulty} - {self.variant.name}")
+
+    def draw_board(self):
+        """
+        Draws the Tic-Tac-Toe board on the canvas. Only the cells that changed since the last call are redrawn,
+        unless the board size changed, in which case the canvas is resized and its items are created anew.
+
+        :return: None
+        """
+        size = self.variant.size
+        if self.renderer.size != size:
+            cell_size = cell_size_for(size)
+            self.canvas.delete('all')
+            self.canvas.config(width=size * cell_size, height=size * cell_size)
+            self.renderer = BoardRenderer(self.canvas, size, cell_size)
+        self.renderer.render(self.board)
 
     def evaluate_game(self):
         """
@@ -244,15 +332,12 @@ class TicTacToe:
         if winner:
             if winner == PLAYER_MARKER:
                 outcome_msg = "Congratulations! You won the game."
-                self.statistics[self.difficulty]["Wins"] += 1
             elif winner == AI_MARKER:
                 outcome_msg = "You lost the game. Better luck next time!"
-                self.statistics[self.difficulty]["Losses"] += 1
             else:
                 outcome_msg = "It's a draw!"
-                self.statistics[self.difficulty]["Draws"] += 1
 
-            self.save_data()
+            self.record_result(winner)
             messagebox.showinfo("End of Game", outcome_msg)
             self.reset_game()
             return True
@@ -269,9 +354,9 @@ class TicTacToe:
         The 'event' object includes information on mouse click position. The system calculates both the index of the
         game board cell corresponding to the clicked position, along with its row and column.
 
-        If the clicked cell is empty, it sets the cell's value to 'X' and redraws the board. If game is ongoing,
-        'ai_move' method is called after half a second delay to have AI move next. The board is updated and redrawn
-        accordingly.
+        If the clicked cell is empty, it sets the cell's value to 'X' and redraws the board. If game is ongoing, the
+        AI move is computed in a worker thread and placed once it is ready and at least ai_delay milliseconds have
+        passed. The window stays responsive meanwhile, but clicks on the board are ignored until the AI has moved.
 
         The game is further evaluated after each move. If it finds the game over, it retreats back.
 
@@ -281,160 +366,76 @@ class TicTacToe:
         game.click(event)
         ```
         """
-        x = event.x // 100
-        y = event.y // 100
-        i = y * 3 + x
+        if self.ai_thinking:
+            return
+        size = self.renderer.size
+        x = event.x // self.renderer.cell_size
+        y = event.y // self.renderer.cell_size
+        if not (0 <= x < size and 0 <= y < size):
+            return
+        i = y * size + x
         if self.board[i] == ' ':
-            self.board[i] = 'X'
-            self.draw_board()
-            if self.evaluate_game():
-                return
-            self.canvas.update()
-            time.sleep(0.5)
-            self.ai_move('O')
+            self.play(i, PLAYER_MARKER)
             self.draw_board()
             if self.evaluate_game():
                 return
+            self.start_ai_move()
 
-    def reset_game(self):
+    def start_ai_move(self):
         """
-        Resets the Tic Tac Toe game.
-
-        This method resets the game by clearing the game board and redrawing the empty game board.
+        Starts computing the AI move on a copy of the game in the worker thread and locks the board.
 
         :return: None
         """
-        self.board = [' ' for _ in range(9)]
-        self.canvas.delete('all')
-        self.draw_board()
+        self.ai_thinking = True
+        planner = self.copy()
+        future = self.ai_executor.submit(planner.ai_move, AI_MARKER)
+        ready_at = time.monotonic() + self.ai_delay / 1000
+        self.root.after(AI_POLL_MS, self.finish_ai_move, planner, future, ready_at, self._game_number)
 
-    def ai_move_easy(self, ch):
+    def finish_ai_move(self, planner, future, ready_at, game_number):
         """
-        Makes a random move for the AI player in an easy difficulty level.
+        Places the AI move once the worker has finished and the delay has passed, checking again later otherwise. If
+        the AI move failed, the error is shown and the game is reset.
 
-        :param ch: The character representing the AI player's move.
-        :return: This method returns nothing.
-        """
-        while True:
-            i = random.randint(0, 8)
-            if self.board[i] == ' ':
-                self.board[i] = ch
-                return
-
-    def ai_move_medium(self, ch):
-        """
-        Represents the medium level AI move in the Tic Tac Toe game.
-
-        :param ch: The player symbol ('X' or 'O') for which the AI will make a move.
-        :type ch: str
+        :param planner: The copy of the game the AI move is computed on.
+        :param future: The Future of the AI move.
+        :param ready_at: The time.monotonic() value before which the move is not shown.
+        :param game_number: The game the move was started in; moves of games that were reset are dropped.
         :return: None
-
-        This method represents the medium level AI move in the Tic Tac Toe game. It takes a parameter 'ch' which
-        represents the player symbol ('X' or 'O') for which the AI will make a move. The method tries to win the game
-        for the given player by checking if making a move will result in a win for the player. If a winning move is
-        found, the method returns. If there is no winning move, the method randomly selects an empty cell on the
-        board and marks it with the player symbol.
-
-        Example usage:
-        ```
-        game = TicTacToe()
-        game.ai_move_medium('X')
-        ```
         """
-        for i in range(9):
-            if self.board[i] == ' ':
-                self.board[i] = ch
-                if self.check_for_win() == 'O':
-                    return
-                self.board[i] = ' '
-
-        for i in range(9):
-            if self.board[i] == ' ':
-                self.board[i] = 'X'
-                if self.check_for_win() == 'X':
-                    self.board[i] = 'O'
-                    return
-                self.board[i] = ' '
-
-        while True:
-            i = random.randint(0, 8)
-            if self.board[i] == ' ':
-                self.board[i] = ch
-                return
+        if game_number != self._game_number:
+            return
+        if not future.done() or time.monotonic() < ready_at:
+            self.root.after(AI_POLL_MS, self.finish_ai_move, planner, future, ready_at, game_number)
+            return
+        try:
+            move = future.result()
+        except Exception as error:
+            # The move is lost; start over rather than let the player move twice
+            messagebox.showerror("AI Error", f"The AI could not compute its move ({error}). The game is reset.")
+            self.reset_game()
+            return
+        self.ai_thinking = False
+        self.play(move, AI_MARKER)
+        self.last_search = planner.last_search
+        self.last_source = planner.last_source
+        self.draw_board()
+        self.evaluate_game()
 
-    def ai_move_hard(self, ch):
+    def reset_game(self):
         """
-            Make a move for the AI player in hard mode.
-
-            This method uses the minimax algorithm to determine the best move to make.
+        Resets the Tic Tac Toe game.
 
-            :param ch: The character representing the current player's piece ('X' or 'O')
-            :return: None
-        """
-        bestScore = float('-inf')
-        move = 0
-        for i in range(len(self.board)):
-            if self.board[i] == ' ':
-                self.board[i] = ch
-                score = self.minimax(self.board, 0, False)
-                self.board[i] = ' '
-                if score > bestScore:
-                    bestScore = score
-                    move = i
-        self.board[move] = ch
+        This method resets the game by clearing the game board and redrawing the empty game board. An AI move that
+        is still being computed is discarded.
 
-    def ai_move(self, ch):
-        """
-        :param ch: The character representing the player ('X' or 'O')
         :return: None
-
-        This method determines the AI's move based on the difficulty level selected.
-        If the difficulty is set to 'Easy', the AI makes a random move.
-        If the difficulty is set to 'Medium', the AI uses a medium-level algorithm to determine its move.
-        If the difficulty is set to 'Hard', the AI uses a hard-level algorithm to determine its move.
-        """
-        if self.difficulty == 'Easy':
-            self.ai_move_easy(ch)
-        elif self.difficulty == 'Medium':
-            self.ai_move_medium(ch)
-        elif self.difficulty == 'Hard':
-            self.ai_move_hard(ch)
-
-    def minimax(self, board, depth, isMaximizing):
         """
-        Returns the optimal score for the current state of the tic-tac-toe board using the minimax algorithm.
-
-        :param board: The current state of the tic-tac-toe board represented as a list.
-        :param depth: The current depth of the minimax algorithm.
-        :param isMaximizing: A boolean flag indicating whether it is the maximizing player's turn or not.
-        :return: The optimal score for the current board state.
-        """
-        winner = self.check_for_win()
-        if winner == 'O':
-            return 1
-        elif winner == 'X':
-            return -1
-        elif winner == 'Tie':
-            return 0
-
-        if isMaximizing:
-            best_score = float('-inf')
-            for i in range(len(board)):
-                if board[i] == ' ':
-                    board[i] = 'O'
-                    score = self.minimax(board, depth + 1, False)
-                    board[i] = ' '
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(len(board)):
-                if board[i] == ' ':
-                    board[i] = 'X'
-                    score = self.minimax(board, depth + 1, True)
-                    board[i] = ' '
-                    best_score = min(score, best_score)
-            return best_score
+        super().reset_game()
+        self._game_number += 1
+        self.ai_thinking = False
+        self.draw_board()
 
     def show_difficulty_selection(self):
         """
@@ -455,7 +456,7 @@ class TicTacToe:
         difficulty_window.update_idletasks()
 
         width = 300
-        height = 300
+        height = 360
         x = (difficulty_window.winfo_screenwidth() // 2) - (width // 2)
         y = (difficulty_window.winfo_screenheight() // 2) - (height // 2)
         difficulty_window.geometry('{}x{}+{}+{}'.format(width, height, x, y))
@@ -469,6 +470,8 @@ class TicTacToe:
                    command=lambda: update_difficulty("Medium")).pack(pady=10)
         ttk.Button(button_frame, text="Hard", bootstyle=DANGER,
                    command=lambda: update_difficulty("Hard")).pack(pady=10)
+        ttk.Button(button_frame, text="MCTS", bootstyle=INFO,
+                   command=lambda: update_difficulty("MCTS")).pack(pady=10)
 
         difficulty_window.grab_set()
         difficulty_window.wait_window()
@@ -549,6 +552,9 @@ class TicTacToe:
         """
         self.show_difficulty_selection()
         self.root.mainloop()
+        if self._ai_executor is not None:
+            self._ai_executor.shutdown(wait=False, cancel_futures=True)
+        self.close()
 
 
 if __name__ == "__main__":
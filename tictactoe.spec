@@ -8,7 +8,8 @@ a = Analysis(
     ['tictactoe.py'],
     pathex=[],
     binaries=[],
-    datas=[('img\\logo.png', 'img\\'), ('img\\logo.ico', 'img\\')],
+    datas=[('img\\logo.png', 'img\\'), ('img\\logo.ico', 'img\\'), ('tttbook.bin', '.'), ('tttvalues.bin', '.'),
+           ('tttdb-3x3-3.bin', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import time
+
+from tttcore import Variant
+from tttcore.mcts import ValueTable, train, value_path
+
+
+def main():
+    """
+    Trains the value table of the MCTS AI by self-play and writes it next to the game.
+
+    :return: The process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Train the value table of the MCTS AI by self-play.")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="the number of self-play games")
+    parser.add_argument("-p", "--playouts", type=int, default=200, help="the number of playouts per move")
+    parser.add_argument("--size", type=int, default=3, help="the number of rows and columns of the board")
+    parser.add_argument("--win-length", type=int, default=None, help="the number of marks in a row that win")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random number generator")
+    parser.add_argument("--resume", action="store_true", help="go on training the existing table")
+    parser.add_argument("-o", "--output", default=value_path, help="the file to write the table to")
+    args = parser.parse_args()
+
+    table = ValueTable.load(args.output) if args.resume else None
+    if args.resume and table is None:
+        print(f"No valid value table at {args.output}")
+        return 1
+    start = time.perf_counter()
+
+    def progress(played, results):
+        if played % 500 == 0 or played == args.games:
+            print(f"{played:>8} games  X {results['X'] / played:6.1%}  O {results['O'] / played:6.1%}  "
+                  f"draws {results['Tie'] / played:6.1%}  {played / (time.perf_counter() - start):6.1f} games/s",
+                  flush=True)
+
+    table = train(Variant.get(args.size, args.win_length), args.games, args.playouts, table, args.seed, progress)
+    table.save(args.output)
+    print(f"Wrote {len(table)} positions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
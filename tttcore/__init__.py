@@ -0,0 +1,16 @@
+"""
+The Tic Tac Toe game core: board, rules, AI strategies and statistics.
+
+Nothing in this package imports tkinter, ttkbootstrap or ctypes, so it can be used without a display.
+"""
+from .book import OpeningBook, get_opening_book
+from .database import OutcomeDatabase, get_database
+from .deepening import IterativeDeepeningSearch, timed_search
+from .engine import (AI_MARKER, EMPTY_MARKER, PLAYER_MARKER, AlphaBetaSearch, Board, SearchResult,
+                     TranspositionTable, best_move, minimax, opponent, search)
+from .game import Game
+from .instrument import SearchStats, Tracer
+from .mcts import MonteCarloSearch, ValueTable, get_value_table
+from .position import Position, zobrist_hash
+from .stats import DIFFICULTIES, OUTCOMES, StatisticsStore, default_statistics
+from .variant import CLASSIC, VARIANTS, Variant
@@ -0,0 +1,243 @@
+"""
+Classifies many 3x3 boards at once and computes the AI moves for them with NumPy.
+
+A batch is an (N, 9) int8 array with one board per row, holding EMPTY, X or O in every cell. This module needs NumPy
+and is therefore not imported by the tttcore package; import it as tttcore.batch.
+"""
+import numpy as np
+
+from . import engine
+from .book import get_opening_book
+from .database import get_database
+from .engine import CELLS, PLAYER_MARKER, AI_MARKER, SYMMETRIES, WINNING, Board
+from .variant import CLASSIC
+
+EMPTY, X, O = 0, 1, 2
+# The values of the winners array, and the check_for_win() result each one stands for
+NO_WINNER, X_WINS, O_WINS, TIE = 0, 1, 2, 3
+WINNER_RESULTS = (False, PLAYER_MARKER, AI_MARKER, 'Tie')
+# The values of the to_move array; positions that are finished or cannot occur have nobody to move
+NOBODY = 0
+BOARD_COUNT = 3 ** CELLS
+# The value of ai_moves() for boards without a move
+NO_MOVE = -1
+MARKERS = {X: PLAYER_MARKER, O: AI_MARKER}
+# The fields of classify(), packed into one record per board so a batch is looked up with a single take
+CLASSIFY_FIELDS = np.dtype([("winners", np.int8), ("terminal", bool), ("legal", bool), ("to_move", np.int8),
+                            ("moves", np.uint16)])
+
+_WINNING = np.frombuffer(WINNING, dtype=np.uint8).astype(bool)
+_BITS = (1 << np.arange(CELLS)).astype(np.int32)
+_POWERS = (3 ** np.arange(CELLS)).astype(np.int32)
+_SYMMETRIES = np.array(SYMMETRIES, dtype=np.intp)
+_LINES = np.array(CLASSIC.lines, dtype=np.int32)
+# The lowest cell of every mask, NO_MOVE for the empty one
+_LOWEST_CELL = np.array([NO_MOVE] + [(mask & -mask).bit_length() - 1 for mask in range(1, 1 << CELLS)],
+                        dtype=np.int8)
+_classified = {}
+
+
+def boards_from_indexes(indexes):
+    """
+    :param indexes: An array of base-3 board indexes as returned by Board.index().
+    :return: The (N, 9) int8 array of the boards.
+    """
+    indexes = np.asarray(indexes, dtype=np.int32)
+    return (indexes[:, None] // _POWERS % 3).astype(np.int8)
+
+
+def all_boards():
+    """
+    :return: The (19683, 9) int8 array of every assignment of the cells, row i being the board with index i.
+    """
+    return boards_from_indexes(np.arange(BOARD_COUNT))
+
+
+def from_boards(boards):
+    """
+    :param boards: An iterable of 3x3 Boards.
+    :return: The (N, 9) int8 array of the boards.
+    """
+    return boards_from_indexes(np.fromiter((board.index() for board in boards), dtype=np.int32))
+
+
+def indexes(boards):
+    """
+    :param boards: An (N, 9) int8 array of boards.
+    :return: The int16 array of the base-3 indexes of the boards, the same values as Board.index().
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    # Horner's scheme from the last cell; the largest index, 19682, fits into int16
+    result = boards[:, CELLS - 1].astype(np.int16)
+    for cell in range(CELLS - 2, -1, -1):
+        result *= 3
+        result += boards[:, cell]
+    return result
+
+
+def masks(boards):
+    """
+    :param boards: An (N, 9) int8 array of boards.
+    :return: Two int32 arrays with the 9-bit masks of the cells of 'X' and of 'O'.
+    """
+    return (boards == X).astype(np.int32) @ _BITS, (boards == O).astype(np.int32) @ _BITS
+
+
+def _classify_boards(boards, first):
+    """
+    Computes the fields of classify() from the cells of the boards.
+    """
+    x_mask, o_mask = masks(boards)
+    x_wins = _WINNING[x_mask]
+    o_wins = _WINNING[o_mask]
+    full = (x_mask | o_mask) == (1 << CELLS) - 1
+
+    winners = np.full(len(boards), NO_WINNER, dtype=np.int8)
+    winners[full] = TIE
+    winners[o_wins] = O_WINS
+    winners[x_wins] = X_WINS
+    terminal = x_wins | o_wins | full
+
+    starter, other = (X, O) if first == PLAYER_MARKER else (O, X)
+    lead = (boards == starter).sum(axis=1) - (boards == other).sum(axis=1)
+    starter_wins, other_wins = (x_wins, o_wins) if first == PLAYER_MARKER else (o_wins, x_wins)
+    legal = (((lead == 0) | (lead == 1)) & ~(starter_wins & other_wins)
+             & ~(starter_wins & (lead == 0)) & ~(other_wins & (lead == 1)))
+
+    to_move = np.where(lead == 0, starter, other).astype(np.int8)
+    to_move[terminal | ~legal] = NOBODY
+    moves = np.where(terminal, 0, ((1 << CELLS) - 1) & ~(x_mask | o_mask)).astype(np.uint16)
+    return {"winners": winners, "terminal": terminal, "legal": legal, "to_move": to_move, "moves": moves}
+
+
+def _tables(first):
+    """
+    Returns the CLASSIFY_FIELDS records of all boards, computing them on first use.
+    """
+    tables = _classified.get(first)
+    if tables is None:
+        fields = _classify_boards(all_boards(), first)
+        tables = np.empty(BOARD_COUNT, dtype=CLASSIFY_FIELDS)
+        for name in CLASSIFY_FIELDS.names:
+            tables[name] = fields[name]
+        _classified[first] = tables
+    return tables
+
+
+def classify(boards, first=PLAYER_MARKER):
+    """
+    Determines the winner, whether the game is over, whether the position can occur and who is to move, for every
+    board of a batch.
+
+    A board can occur if the player who started has as many marks as the other player or one more, at most one
+    player has three in a row, and a winner made the last move.
+
+    All 19683 boards are classified once, so a batch only costs computing its indexes and looking up one record of
+    all the fields per board. The arrays returned are views of the fields of these records.
+
+    :param boards: An (N, 9) int8 array of boards.
+    :param first: The marker of the player who moves first ('X' or 'O').
+    :return: A dictionary of arrays of length N:
+        'winners': int8, NO_WINNER, X_WINS, O_WINS or TIE, the same result as check_for_win()
+        'terminal': bool, True if the game is over
+        'legal': bool, True if the position can occur in a game
+        'to_move': int8, X or O for the player to move, NOBODY if the game is over or the position cannot occur
+        'moves': uint16, the mask of the empty cells, 0 if the game is over
+    """
+    records = np.take(_tables(first), indexes(boards))
+    return {name: records[name] for name in CLASSIFY_FIELDS.names}
+
+
+def canonical_indexes(boards):
+    """
+    Reduces every board to the symmetric variant with the smallest index, like engine.canonical() does for one
+    position.
+
+    :param boards: An (N, 9) int8 array of boards.
+    :return: Two arrays: the int16 index of the canonical variant of each board, and the index into SYMMETRIES of
+    the symmetry that produces it. Cell j of the canonical board is cell SYMMETRIES[symmetry][j] of the board.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    candidates = np.stack([indexes(boards[:, symmetry]) for symmetry in _SYMMETRIES], axis=1)
+    symmetry = candidates.argmin(axis=1)
+    return candidates[np.arange(len(boards)), symmetry], symmetry
+
+
+def _random_cells(boards, rng):
+    """
+    Draws one empty cell of every board; full boards get cell 0.
+    """
+    keys = rng.random(boards.shape)
+    keys[boards != EMPTY] = -1
+    return keys.argmax(axis=1)
+
+
+def _hard_move(index, mover):
+    """
+    Plays the Hard AI move on one board, like Game.ai_move_hard().
+    """
+    board = Board.from_cells(' XO'[value] for value in boards_from_indexes([index])[0])
+    marker = MARKERS[mover]
+    if marker == AI_MARKER:
+        book = get_opening_book()
+        move = book.move(board) if book is not None else None
+        if move is not None:
+            return move
+    database = get_database(CLASSIC)
+    move = database.best_move(board, marker) if database is not None else None
+    return move if move is not None else engine.search(board, marker).move
+
+
+def _threat_cells(boards, to_move):
+    """
+    Finds the cell the Medium AI completes or blocks a line on for every board, like Variant.threats() does for one,
+    or NO_MOVE if it would play a random cell.
+    """
+    x_mask, o_mask = masks(boards)
+    mover = np.where(to_move == O, o_mask, x_mask)[:, None]
+    waiting = np.where(to_move == O, x_mask, o_mask)[:, None]
+    empty = _LINES & ~(mover | waiting)
+    threat = (empty != 0) & (empty & (empty - 1) == 0)
+    wins = np.bitwise_or.reduce(np.where(threat & (waiting & _LINES == 0), empty, 0), axis=1)
+    blocks = np.bitwise_or.reduce(np.where(threat & (mover & _LINES == 0), empty, 0), axis=1)
+    return _LOWEST_CELL[np.where(wins != 0, wins, blocks)]
+
+
+def ai_moves(boards, difficulty="Hard", first=PLAYER_MARKER, symmetric=True, seed=None):
+    """
+    Computes the AI move of the player to move for every board of a batch, without changing anything.
+
+    Each distinct position is solved once. With symmetric, the Hard AI also solves only one of the rotated and
+    mirrored variants of a position and maps its move back; the moves are then as good as the ones ai_move() plays,
+    but may be a symmetric alternative among equally good cells. Easy and Medium moves are drawn from a NumPy
+    generator seeded with seed.
+
+    :param boards: An (N, 9) int8 array of boards.
+    :param difficulty: The difficulty level of the AI ('Easy', 'Medium' or 'Hard').
+    :param first: The marker of the player who moved first, which determines the player to move.
+    :param symmetric: False to return exactly the moves of Game.ai_move(), deduplicating identical boards only.
+    :param seed: The seed of the random moves, or None for unpredictable ones.
+    :return: An int8 array of length N with the cell played, NO_MOVE for boards that are finished or cannot occur.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    rows = indexes(boards)
+    to_move = _tables(first)["to_move"][rows]
+    if difficulty == "Easy":
+        moves = _random_cells(boards, np.random.default_rng(seed)).astype(np.int8)
+    elif difficulty == "Medium":
+        moves = _threat_cells(boards, to_move)
+        random_cells = moves == NO_MOVE
+        moves[random_cells] = _random_cells(boards[random_cells], np.random.default_rng(seed))
+    elif difficulty == "Hard":
+        if symmetric:
+            rows, symmetry = canonical_indexes(boards)
+        keys, inverse = np.unique(rows.astype(np.int32) * 3 + to_move, return_inverse=True)
+        solved = np.array([_hard_move(key // 3, key % 3) if key % 3 else NO_MOVE for key in keys.tolist()],
+                          dtype=np.int8)
+        moves = solved[inverse]
+        if symmetric:
+            moves = np.where(moves == NO_MOVE, NO_MOVE, _SYMMETRIES[symmetry, moves]).astype(np.int8)
+    else:
+        raise ValueError(f"unknown difficulty {difficulty!r}")
+    moves[to_move == NOBODY] = NO_MOVE
+    return moves
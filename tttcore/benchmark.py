@@ -0,0 +1,238 @@
+"""
+Measures how long the AI levels and the win check take on a fixed set of positions.
+
+Every case plays one move, or checks one board, for each benchmark position and repeats this for a number of rounds,
+after one untimed round that fills the caches. Calls taking microseconds are timed in batches and each batch counts
+as its mean, so the clock does not dominate the result. The report holds the latency percentiles of single calls,
+the positions searched per second where the case searches, and the peak memory Python allocated during one extra
+round run under tracemalloc. Reports are plain dictionaries that can be written as JSON and compared with compare().
+"""
+import platform
+import time
+import tracemalloc
+
+from . import engine
+from .book import book_positions
+from .engine import AI_MARKER, PLAYER_MARKER, Board, TranspositionTable
+from .game import Game
+
+REPORT_VERSION = 1
+DEFAULT_ROUNDS = 20
+DEFAULT_THRESHOLD = 0.20
+# The number of mid-game positions, drawn evenly from the opening book positions with five marks
+MIDGAME_POSITIONS = 8
+# The seconds the 4x4 Hard case may search per move
+LARGE_TIME_BUDGET = 0.1
+# Report metrics, and whether a higher value is better
+METRICS = {
+    "p50_us": False,
+    "p90_us": False,
+    "p99_us": False,
+    "nodes_per_second": True,
+    "peak_memory_bytes": False,
+}
+
+
+def percentile(values, share):
+    """
+    :param values: A sorted list of numbers.
+    :param share: The percentile as a fraction, for example 0.99.
+    :return: The smallest value that at least that share of the values does not exceed.
+    """
+    return values[min(len(values) - 1, max(0, int(len(values) * share + 0.999999) - 1))]
+
+
+def benchmark_positions():
+    """
+    Lists the positions every case is measured on, all with 'O' to move: the empty board, the nine replies to the
+    player's first move and a fixed sample of mid-game positions.
+
+    :return: A list of tuples of a name and a 3x3 Board.
+    """
+    positions = [("empty", Board())]
+    for cell in range(9):
+        board = Board()
+        board[cell] = PLAYER_MARKER
+        positions.append((f"reply {cell}", board))
+    midgame = [board for board in book_positions() if board.x.bit_count() == 3]
+    step = len(midgame) // MIDGAME_POSITIONS
+    for board in midgame[::step][:MIDGAME_POSITIONS]:
+        positions.append((''.join(board).replace(' ', '.'), board))
+    return positions
+
+
+def large_positions():
+    """
+    :return: The 4x4 Boards the large-board Hard case is measured on: the empty board and two openings.
+    """
+    boards = []
+    for cells in ((), (5,), (5, 10, 0)):
+        board = Game(data_file=None, size=4).board
+        for turn, cell in enumerate(cells):
+            board[cell] = PLAYER_MARKER if turn % 2 == 0 else AI_MARKER
+        boards.append(board)
+    return boards
+
+
+def win_check_case():
+    """
+    :return: The case timing check_for_win().
+    """
+    game = Game(data_file=None)
+
+    def run(board):
+        game.board = board
+        game.check_for_win()
+        return 0
+
+    return run
+
+
+def level_case(difficulty, **options):
+    """
+    :param difficulty: The difficulty level of the AI ('Easy', 'Medium', 'Hard' or 'MCTS').
+    :param options: Further arguments of Game, for example size.
+    :return: The case timing ai_move() on that level, counting the positions a Hard search visits or the playouts of
+    an MCTS search.
+    """
+    game = Game(difficulty, data_file=None, seed=0, **options)
+
+    def run(board):
+        game.board = board.copy()
+        game.last_search = None
+        game.ai_move(AI_MARKER)
+        return game.last_search.nodes if game.last_search is not None else 0
+
+    return run
+
+
+def search_case():
+    """
+    :return: The case timing the alpha-beta search behind Hard mode with an empty transposition table, so every move
+    is searched in full instead of being read from the opening book.
+    """
+    def run(board):
+        return engine.search(board, AI_MARKER, table=TranspositionTable()).nodes
+
+    return run
+
+
+def benchmark_cases():
+    """
+    :return: A list of tuples of the case name, a function creating its callable, whether it counts searched
+    positions, the number of calls timed together, and the boards it runs on (None for benchmark_positions()).
+    """
+    return [
+        ("check_for_win", win_check_case, False, 100, None),
+        ("Easy", lambda: level_case("Easy"), False, 20, None),
+        ("Medium", lambda: level_case("Medium"), False, 20, None),
+        ("Hard", lambda: level_case("Hard"), True, 1, None),
+        ("Hard search", search_case, True, 1, None),
+        ("MCTS", lambda: level_case("MCTS"), True, 1, None),
+        ("Hard 4x4", lambda: level_case("Hard", size=4, time_budget=LARGE_TIME_BUDGET), True, 1, large_positions()),
+    ]
+
+
+def measure(run, boards, rounds, batch=1):
+    """
+    Calls a case batch times per board and round.
+
+    :return: A tuple of the sorted latencies of one call in seconds, one per board and round, and the number of
+    positions searched.
+    """
+    for board in boards:
+        run(board)
+    latencies = []
+    nodes = 0
+    clock = time.perf_counter
+    repeats = range(batch)
+    for _ in range(rounds):
+        for board in boards:
+            start = clock()
+            for _ in repeats:
+                nodes += run(board)
+            latencies.append((clock() - start) / batch)
+    latencies.sort()
+    return latencies, nodes
+
+
+def peak_memory(run, boards):
+    """
+    :return: The most bytes Python had allocated above the starting level during one round of a case.
+    """
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        for board in boards:
+            run(board)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(rounds=DEFAULT_ROUNDS, names=None, progress=None):
+    """
+    Runs the benchmark cases.
+
+    :param rounds: How often every case runs over its positions.
+    :param names: The names of the cases to run, or None for all of them.
+    :param progress: A function called with each case name before it starts, or None.
+    :return: The report as a dictionary, see the module description.
+    """
+    positions = [board for _, board in benchmark_positions()]
+    report = {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rounds": rounds,
+        "cases": {},
+    }
+    for name, make_case, searches, batch, boards in benchmark_cases():
+        if names is not None and name not in names:
+            continue
+        if progress is not None:
+            progress(name)
+        boards = boards or positions
+        engine.alphabeta_table.clear()
+        run = make_case()
+        latencies, nodes = measure(run, boards, rounds, batch)
+        total = sum(latencies) * batch
+        engine.alphabeta_table.clear()
+        peak = peak_memory(make_case(), boards)
+        report["cases"][name] = {
+            "moves": len(latencies),
+            "mean_us": total / len(latencies) * 1e6,
+            "p50_us": percentile(latencies, 0.5) * 1e6,
+            "p90_us": percentile(latencies, 0.9) * 1e6,
+            "p99_us": percentile(latencies, 0.99) * 1e6,
+            "max_us": latencies[-1] * 1e6,
+            "nodes": nodes if searches else None,
+            "nodes_per_second": nodes / total if searches and total else None,
+            "peak_memory_bytes": peak,
+        }
+    return report
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares the metrics of two reports case by case.
+
+    :param baseline: The report to compare against.
+    :param current: The new report.
+    :param threshold: The relative change, for example 0.1 for 10%, beyond which a worse value is a regression.
+    :return: A list of tuples of the case, the metric, the baseline value, the current value, the relative change
+    and whether it is a regression. Cases or metrics missing from either report are skipped.
+    """
+    rows = []
+    for name, case in current["cases"].items():
+        old_case = baseline["cases"].get(name)
+        if old_case is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = old_case.get(metric), case.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append((name, metric, old, new, change, worse > threshold))
+    return rows
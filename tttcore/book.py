@@ -0,0 +1,141 @@
+import os
+import struct
+import sys
+import zlib
+
+from .engine import Board
+
+BOOK_MAGIC = b'TTTB'
+BOOK_HEADER = struct.Struct('<4sI')
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 0xFF
+
+if getattr(sys, 'frozen', False):
+    base_dir = sys._MEIPASS
+else:
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+book_path = os.path.join(base_dir, 'tttbook.bin')
+_opening_book = None
+
+
+def book_positions():
+    """
+    Enumerates every position in which the AI ('O') has to move in a game the player ('X') started.
+
+    :return: A list of Boards, sorted by their base-3 index.
+    """
+    seen = set()
+    stack = [Board()]
+    while stack:
+        board = stack.pop()
+        if board in seen:
+            continue
+        seen.add(board)
+        if board.winner():
+            continue
+        marker = 'X' if board.x.bit_count() == board.o.bit_count() else 'O'
+        for i in board.legal_moves():
+            child = board.copy()
+            child[i] = marker
+            stack.append(child)
+    return sorted((board for board in seen if board.x.bit_count() == board.o.bit_count() + 1 and not board.winner()),
+                  key=Board.index)
+
+
+class OpeningBook:
+    """
+    A precomputed table holding the Hard AI's move for every position it can face.
+
+    The table is a byte array indexed by the base-3 encoding of the board (see Board.index). Positions that can never
+    be handed to the AI hold NO_MOVE.
+
+    Attributes:
+    - moves: A bytes object of length 3 ** 9 with the stored moves
+    """
+
+    def __init__(self, moves):
+        """
+        :param moves: A bytes-like object of length 3 ** 9.
+        """
+        if len(moves) != BOOK_SIZE:
+            raise ValueError(f"Opening book must hold {BOOK_SIZE} entries, got {len(moves)}")
+        self.moves = bytes(moves)
+
+    def move(self, board):
+        """
+        Looks up the stored move for a board.
+
+        :param board: The Board to look up.
+        :return: The index of the cell to play, or None if the book has no move for this board.
+        """
+        move = self.moves[board.index()]
+        if move == NO_MOVE:
+            return None
+        return move
+
+    @classmethod
+    def generate(cls, solve):
+        """
+        Solves every book position once.
+
+        :param solve: A function taking a Board and returning the cell the AI plays.
+        :return: A new OpeningBook.
+        """
+        moves = bytearray([NO_MOVE]) * BOOK_SIZE
+        for board in book_positions():
+            moves[board.index()] = solve(board)
+        return cls(moves)
+
+    def verify(self, solve):
+        """
+        Checks the book against a search on every book position.
+
+        :param solve: A function taking a Board and returning the cell the AI plays.
+        :return: A list of the boards on which the book and the search disagree.
+        """
+        return [board for board in book_positions() if self.move(board) != solve(board)]
+
+    def save(self, path=book_path):
+        """
+        Writes the book to a file with a checksummed header.
+
+        :param path: The file to write.
+        :return: None
+        """
+        with open(path, 'wb') as f:
+            f.write(BOOK_HEADER.pack(BOOK_MAGIC, zlib.crc32(self.moves)))
+            f.write(self.moves)
+
+    @classmethod
+    def load(cls, path=book_path):
+        """
+        Reads a book written by save().
+
+        :param path: The file to read.
+        :return: The OpeningBook, or None if the file is missing or damaged.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != BOOK_HEADER.size + BOOK_SIZE:
+            return None
+        magic, checksum = BOOK_HEADER.unpack_from(data)
+        moves = data[BOOK_HEADER.size:]
+        if magic != BOOK_MAGIC or zlib.crc32(moves) != checksum:
+            return None
+        return cls(moves)
+
+
+def get_opening_book():
+    """
+    Loads the opening book shipped next to the game on first use.
+
+    :return: The OpeningBook, or None if it is missing or damaged.
+    """
+    global _opening_book
+    if _opening_book is None:
+        _opening_book = OpeningBook.load() or False
+    return _opening_book or None
@@ -0,0 +1,214 @@
+"""
+Reading the win/draw/loss databases written by the retrograde solver in tttcore.retrograde.
+
+A database holds one byte for every assignment of the cells of a board, at the base-3 index of Board.index(): the
+outcome for the player to move in the top two bits and the number of plies to the end of the game with perfect play
+in the other six. The player to move is 'X' if both players have as many marks, otherwise 'O'; a position with the
+other player to move is looked up with the colors swapped. Files are memory-mapped, so a lookup only reads the pages it
+touches.
+"""
+import mmap
+import os
+import struct
+
+from .book import base_dir
+
+DATABASE_MAGIC = b'TTTR'
+# The magic, the board size, the win length and the number of positions
+DATABASE_HEADER = struct.Struct('<4sBB2xQ')
+# The outcomes for the player to move; positions that cannot occur hold NO_RESULT
+NO_RESULT, WIN, DRAW, LOSS = 0, 1, 2, 3
+OUTCOME_NAMES = ("no result", "win", "draw", "loss")
+OUTCOME_SHIFT = 6
+DISTANCE_MASK = (1 << OUTCOME_SHIFT) - 1
+# The largest board a database is written for; 3 ** 16 positions take 43 MB
+MAX_CELLS = 16
+
+_databases = {}
+
+
+def entry(outcome, distance):
+    """
+    :param outcome: WIN, DRAW or LOSS.
+    :param distance: The number of plies to the end of the game.
+    :return: The byte stored for a position.
+    """
+    return outcome << OUTCOME_SHIFT | distance
+
+
+def move_key(child):
+    """
+    Ranks a move by the entry of the position it leads to, so the best move has the highest key: the fastest win,
+    then a draw, then the slowest loss.
+
+    :param child: The entry of the position after the move, which has the opponent to move.
+    :return: The key, or -1 if the position has no result.
+    """
+    outcome = child >> OUTCOME_SHIFT
+    distance = (child & DISTANCE_MASK) + 1
+    if outcome == LOSS:
+        return 2 * (DISTANCE_MASK + 1) + DISTANCE_MASK - distance
+    if outcome == DRAW:
+        return DISTANCE_MASK + 1 + distance
+    if outcome == WIN:
+        return distance
+    return -1
+
+
+def key_entry(key):
+    """
+    :param key: A key returned by move_key() for the best move of a position.
+    :return: The entry of the position.
+    """
+    if key > 2 * DISTANCE_MASK + 1:
+        return entry(WIN, 2 * (DISTANCE_MASK + 1) + DISTANCE_MASK - key)
+    if key > DISTANCE_MASK:
+        return entry(DRAW, key - DISTANCE_MASK - 1)
+    return entry(LOSS, key)
+
+
+def database_path(variant):
+    """
+    :param variant: The Variant.
+    :return: The file the database of the variant is shipped in, next to the game.
+    """
+    return os.path.join(base_dir, f'tttdb-{variant.size}x{variant.size}-{variant.win_length}.bin')
+
+
+class OutcomeDatabase:
+    """
+    A memory-mapped win/draw/loss database of one variant.
+
+    Attributes:
+    - variant: The Variant of the boards
+    - path: The database file
+    """
+
+    def __init__(self, variant, path, data):
+        """
+        :param variant: The Variant of the boards.
+        :param path: The database file.
+        :param data: The mmap of the file.
+        """
+        self.variant = variant
+        self.path = path
+        self._data = data
+        self._powers = tuple(3 ** cell for cell in range(variant.cells))
+
+    @classmethod
+    def open(cls, variant, path=None):
+        """
+        Maps a database written by tttcore.retrograde.solve().
+
+        :param variant: The Variant of the boards.
+        :param path: The database file, or None for database_path(variant).
+        :return: The OutcomeDatabase, or None if the file is missing or was written for another board.
+        """
+        path = path if path is not None else database_path(variant)
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        positions = 3 ** variant.cells
+        if len(data) != DATABASE_HEADER.size + positions:
+            data.close()
+            return None
+        magic, size, win_length, count = DATABASE_HEADER.unpack_from(data)
+        if (magic, size, win_length, count) != (DATABASE_MAGIC, variant.size, variant.win_length, positions):
+            data.close()
+            return None
+        return cls(variant, path, data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmaps the file.
+
+        :return: None
+        """
+        self._data.close()
+
+    def index(self, board, marker):
+        """
+        :param board: The Board.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A tuple of the index of the position in the database and the digit of the player to move there, 1
+        or 2. If the position has 'O' to move with as many marks as 'X', or the other way round, the colors are
+        swapped.
+        """
+        variant = self.variant
+        mover = board.mask(marker)
+        waiting = (board.x | board.o) ^ mover
+        if mover.bit_count() == waiting.bit_count():
+            return variant.base3(mover) + 2 * variant.base3(waiting), 1
+        return variant.base3(waiting) + 2 * variant.base3(mover), 2
+
+    def lookup(self, board, marker):
+        """
+        :param board: The Board.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A tuple of the outcome for the player to move (NO_RESULT, WIN, DRAW or LOSS) and the number of plies
+        to the end of the game with perfect play.
+        """
+        value = self._data[DATABASE_HEADER.size + self.index(board, marker)[0]]
+        return value >> OUTCOME_SHIFT, value & DISTANCE_MASK
+
+    def score(self, board, marker):
+        """
+        Scores a position like AlphaBetaSearch does: a win in d plies with e empty cells scores e + 1 - d, a loss the
+        negative of that and a draw 0, so the outcome and the distance can both be read from the score.
+
+        :param board: The Board, which must not be finished.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: The score for the player to move, or None if the database has no result for the position.
+        """
+        outcome, distance = self.lookup(board, marker)
+        if outcome == NO_RESULT:
+            return None
+        if outcome == DRAW:
+            return 0
+        score = board.empty_mask().bit_count() + 1 - distance
+        return score if outcome == WIN else -score
+
+    def best_move(self, board, marker):
+        """
+        Finds the move with the fastest win, or a draw, or the slowest loss. Of equal moves, the first one in the move
+        order of the variant is played, so on 3x3 this is the move of the Hard AI search.
+
+        :param board: The Board, which must not be finished.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: The index of the cell, or None if the database has no result for the position.
+        """
+        index, digit = self.index(board, marker)
+        offset = DATABASE_HEADER.size + index
+        data = self._data
+        if data[offset] >> OUTCOME_SHIFT == NO_RESULT:
+            return None
+        free = board.empty_mask()
+        best = None
+        best_key = -1
+        for cell in self.variant.move_order:
+            if free >> cell & 1:
+                key = move_key(data[offset + digit * self._powers[cell]])
+                if key > best_key:
+                    best, best_key = cell, key
+        return best
+
+
+def get_database(variant):
+    """
+    Maps the database of a variant shipped next to the game on first use.
+
+    :param variant: The Variant.
+    :return: The OutcomeDatabase, or None if there is none for the variant.
+    """
+    database = _databases.get(variant)
+    if database is None:
+        database = _databases[variant] = OutcomeDatabase.open(variant) or False
+    return database or None
@@ -0,0 +1,282 @@
+import time
+
+from .engine import EXACT, LOWER_BOUND, UPPER_BOUND, SearchResult, TranspositionTable, cells_of
+from .position import Position, line_weights
+
+# Seconds the Hard AI may think about one move on boards larger than 3x3
+DEFAULT_TIME_BUDGET = 1.0
+# The share of the budget kept back for returning from the search
+TIME_MARGIN = 0.05
+# A win scores WIN_VALUE plus the number of empty cells left, which is more than any heuristic score can reach
+WIN_VALUE = 1 << 30
+INFINITY = 2 * WIN_VALUE
+# On boards at least this large only empty cells next to a mark are searched
+NEIGHBOURHOOD_MIN_SIZE = 6
+DEEPENING_TABLE_SIZE = 200000
+
+
+def deadline_after(time_budget):
+    """
+    :param time_budget: The seconds a search may take, or None for no limit.
+    :return: The time.perf_counter() value at which the search has to stop, keeping TIME_MARGIN of the budget back.
+    """
+    if time_budget is None:
+        return float('inf')
+    return time.perf_counter() + time_budget * (1 - TIME_MARGIN)
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget of a move is used up.
+    """
+
+
+class IterativeDeepeningSearch:
+    """
+    The Hard AI search for boards other than 3x3: alpha-beta negamax to a growing depth, with a heuristic evaluation
+    at the depth limit and a time budget per move.
+
+    The search runs with depth 1, 2, 3, ... until the budget is used up, a win or loss is proven or the whole game
+    tree has been searched. The clock is checked at every position, so the search returns within the budget with
+    the best move of the deepest finished iteration. Each iteration starts with the best move of the one before, and
+    the transposition table keeps the best move of every position for the next iteration.
+
+    Moves are made and unmade on a Position, which detects wins and keeps the Zobrist hash used as the table key and
+    the evaluation up to date move by move. The evaluation sums every line that only one player has marks in:
+    10 ** n for n marks of the player to move, minus the same for the opponent.
+
+    Attributes:
+    - variant: The Variant searched
+    - time_budget: The seconds one search may take, or None for no limit
+    - max_depth: The depth of the last iteration, or None for no limit
+    - table: The TranspositionTable caching (depth, score, bound, move) entries
+    - nodes: The number of positions visited since the search was created
+    - depth: The depth of the deepest finished iteration of the last search
+    """
+
+    def __init__(self, variant, time_budget=DEFAULT_TIME_BUDGET, table=None, max_depth=None):
+        """
+        :param variant: The Variant of the boards to search.
+        :param time_budget: The seconds one search may take, or None to search without a time limit.
+        :param table: The TranspositionTable to cache positions in, or None for a new one. A table must only be
+        shared between searches of the same variant.
+        :param max_depth: The depth of the last iteration, or None to go on until the game tree is exhausted.
+        """
+        self.variant = variant
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = table if table is not None else TranspositionTable(DEEPENING_TABLE_SIZE)
+        self.nodes = 0
+        self.depth = 0
+        self.weights = line_weights(variant.win_length)
+        self.restricted = variant.size >= NEIGHBOURHOOD_MIN_SIZE
+        self._deadline = 0.0
+        self._iteration_best = None
+
+    def search(self, board, marker):
+        """
+        Searches the best move for a player within the time budget.
+
+        :param board: The Board to search, which must not be finished.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A SearchResult with the move, its score and the number of positions visited for it. The score is
+        None if not even the first iteration finished in time.
+        """
+        self._deadline = deadline_after(self.time_budget)
+        nodes = self.nodes
+        position = self.new_position(board, marker)
+        free = board.empty_mask()
+        empties = free.bit_count()
+        near = self.near_mask(board)
+
+        moves = self._moves(free, near, None)
+        move = moves[0]
+        score = None
+        self.depth = 0
+        try:
+            for depth in range(1, self.last_depth(empties) + 1):
+                self._iteration_best = None
+                score, move = self._root(position, near, moves, depth, empties)
+                self.depth = depth
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(score) > WIN_VALUE:
+                    break
+        except SearchTimeout:
+            # The best move of an unfinished iteration is at least as good as the one of the iteration before,
+            # which was searched first
+            if self._iteration_best is not None:
+                score, move = self._iteration_best
+        return SearchResult(move, score, self.nodes - nodes)
+
+    def last_depth(self, empties):
+        """
+        :param empties: The number of empty cells of the root position.
+        :return: The depth of the last iteration.
+        """
+        return empties if self.max_depth is None else min(empties, self.max_depth)
+
+    def near_mask(self, board):
+        """
+        :param board: The Board to search.
+        :return: The mask of the cells next to a mark, where the search looks for moves on large boards.
+        """
+        near = 0
+        for cell in cells_of(board.x | board.o):
+            near |= self.variant.neighbours[cell]
+        return near
+
+    def root_moves(self, board):
+        """
+        :param board: The Board to search.
+        :return: The moves of the root position in the order the first iteration searches them.
+        """
+        return self._moves(board.empty_mask(), self.near_mask(board), None)
+
+    def new_position(self, board, marker):
+        """
+        :param board: The Board to search.
+        :param marker: The marker of the player to move.
+        :return: The Position the search makes and unmakes its moves on.
+        """
+        return Position.from_board(board, marker)
+
+    def evaluate(self, mover, waiting):
+        """
+        Scores a position from scratch by scanning all lines; the search reads the same score from its Position.
+
+        :param mover: The mask of the player to move.
+        :param waiting: The mask of the other player.
+        :return: The heuristic score of the position for the player to move.
+        """
+        weights = self.weights
+        score = 0
+        for line in self.variant.lines:
+            own = mover & line
+            other = waiting & line
+            if own:
+                if not other:
+                    score += weights[own.bit_count()]
+            elif other:
+                score -= weights[other.bit_count()]
+        return score
+
+    def _moves(self, free, near, hint):
+        """
+        Lists the moves to search, the move from the transposition table first and the others by Variant.move_order.
+        """
+        candidates = free & near if self.restricted else free
+        if not candidates:
+            candidates = free
+        moves = sorted(cells_of(candidates), key=self.variant.order_rank.__getitem__)
+        if hint is not None and hint != moves[0] and hint in moves:
+            moves.remove(hint)
+            moves.insert(0, hint)
+        return moves
+
+    def _root(self, position, near, moves, depth, empties):
+        """
+        Runs one iteration over the moves of the root position and returns the best score and move.
+        """
+        alpha = -INFINITY
+        move = None
+        for cell in moves:
+            score = self.score_move(position, near, cell, depth, alpha, empties)
+            if move is None or score > alpha:
+                alpha = score
+                move = cell
+                self._iteration_best = (score, move)
+        return alpha, move
+
+    def score_move(self, position, near, cell, depth, alpha, empties):
+        """
+        Scores one move of the root position within the window (alpha, infinity). A score above alpha is exact, any
+        other score only shows that the move is not better than alpha.
+
+        :param position: The Position of the root.
+        :param near: The mask of the cells next to a mark of the root position.
+        :param cell: The cell to play.
+        :param depth: The depth of the iteration, counting the move itself.
+        :param alpha: The score the move has to beat.
+        :param empties: The number of empty cells of the root position.
+        :return: The score of the move for the player to move at the root.
+        """
+        if position.make(cell):
+            score = WIN_VALUE + empties
+        elif empties == 1:
+            score = 0
+        else:
+            score = -self._search(position, near | self.variant.neighbours[cell], depth - 1, -INFINITY, -alpha,
+                                  empties - 1)
+        position.unmake()
+        return score
+
+    def _search(self, position, near, depth, alpha, beta, empties):
+        """
+        Scores a position that is not finished yet within the window (alpha, beta), searching depth more moves.
+        """
+        self.nodes += 1
+        if time.perf_counter() > self._deadline:
+            raise SearchTimeout
+        if depth == 0:
+            return position.evaluate()
+
+        table = self.table
+        key = position.hash
+        hint = None
+        entry = table.lookup(key)
+        if entry is not None:
+            entry_depth, score, bound, hint = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return score
+                if bound == LOWER_BOUND and score > alpha:
+                    alpha = score
+                elif bound == UPPER_BOUND and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        neighbours = self.variant.neighbours
+        for cell in self._moves(position.empty_mask(), near, hint):
+            if position.make(cell):
+                position.unmake()
+                best_score = WIN_VALUE + empties
+                best_move = cell
+                break
+            if empties == 1:
+                score = 0
+            else:
+                score = -self._search(position, near | neighbours[cell], depth - 1, -beta, -alpha, empties - 1)
+            position.unmake()
+            if score > best_score:
+                best_score = score
+                best_move = cell
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        table.store(key, (depth, best_score, bound, best_move))
+        return best_score
+
+
+def timed_search(board, marker, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Runs the Hard AI search for a player on a board of any variant.
+
+    :param board: The Board to search.
+    :param marker: The marker of the player to move ('X' or 'O').
+    :param time_budget: The seconds the search may take.
+    :return: A SearchResult with the move, its score and the number of positions visited.
+    """
+    return IterativeDeepeningSearch(board.variant, time_budget).search(board, marker)
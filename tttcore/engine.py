@@ -0,0 +1,512 @@
+from collections import OrderedDict, namedtuple
+
+from .variant import CLASSIC
+
+PLAYER_MARKER = 'X'
+AI_MARKER = 'O'
+EMPTY_MARKER = ' '
+CELLS = 9
+FULL_MASK = (1 << CELLS) - 1
+WIN_CONDITIONS = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
+WIN_MASKS = tuple(sum(1 << i for i in line) for line in WIN_CONDITIONS)
+# The 8 rotations/reflections of the square, each given as the source cell for every target cell
+SYMMETRIES = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # rotate 90
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # rotate 180
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # rotate 270
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # mirror vertical axis
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # mirror horizontal axis
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # mirror main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # mirror anti diagonal
+)
+# Center first, then the corners, then the edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+# A win scores the number of empty cells left plus one, so faster wins score higher and slower losses score less
+WIN_SCORE = CELLS + 1
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+TRANSPOSITION_TABLE_SIZE = 100000
+# Positions with fewer empty cells are searched faster than they can be canonicalized, so they are not cached
+CACHE_MIN_EMPTY = 4
+
+
+def _has_line(mask):
+    for win_mask in WIN_MASKS:
+        if mask & win_mask == win_mask:
+            return True
+    return False
+
+
+def _cell_table(cell_values, empty, combine):
+    """
+    Builds a lookup table over all 9-bit masks by combining the value of the lowest set cell with the entry of the
+    mask without that cell.
+    """
+    table = [empty] * (FULL_MASK + 1)
+    for mask in range(1, FULL_MASK + 1):
+        low = mask & -mask
+        table[mask] = combine(cell_values[low.bit_length() - 1], table[mask ^ low])
+    return tuple(table)
+
+
+# Every 9-bit mask is checked against the 8 win masks once, so a win check during search is a single lookup
+WINNING = bytes(_has_line(mask) for mask in range(FULL_MASK + 1))
+# For each symmetry, the image of every 9-bit mask
+SYMMETRY_TABLES = tuple(_cell_table([1 << symmetry.index(cell) for cell in range(CELLS)], 0, int.__or__)
+                        for symmetry in SYMMETRIES)
+# The single-bit masks of the set cells of every 9-bit mask, in ascending cell order
+MOVE_BITS = _cell_table([(1 << cell,) for cell in range(CELLS)], (), tuple.__add__)
+# The same bits ordered by MOVE_ORDER
+ORDERED_MOVE_BITS = tuple(tuple(1 << i for i in MOVE_ORDER if mask >> i & 1) for mask in range(FULL_MASK + 1))
+# The base-3 value of every 9-bit mask with a 1 in each set cell
+BASE3 = _cell_table([3 ** cell for cell in range(CELLS)], 0, int.__add__)
+
+
+def opponent(marker):
+    """
+    :param marker: 'X' or 'O'.
+    :return: The marker of the other player.
+    """
+    return AI_MARKER if marker == PLAYER_MARKER else PLAYER_MARKER
+
+
+def is_win(mask):
+    """
+    :param mask: The 9-bit mask of one player's cells.
+    :return: True if the mask contains three in a row.
+    """
+    return bool(WINNING[mask])
+
+
+def cells_of(mask):
+    """
+    :param mask: A 9-bit mask.
+    :return: The indexes of the set cells, in ascending order.
+    """
+    cells = []
+    while mask:
+        bit = mask & -mask
+        cells.append(bit.bit_length() - 1)
+        mask ^= bit
+    return cells
+
+
+class Board:
+    """
+    A Tic Tac Toe board stored as one integer mask per player.
+
+    Bit i of a mask is set when the player owns cell i, counting row by row from the top left. The board also behaves
+    like the former list of markers: indexing, assignment, iteration and `in` all work with ' ', 'X' and 'O'.
+
+    The classic 3x3 board uses the precomputed 9-bit tables of this module; other sizes and win lengths are checked
+    with the lines of their Variant.
+
+    Attributes:
+    - x: The mask of the cells owned by 'X'
+    - o: The mask of the cells owned by 'O'
+    - variant: The Variant giving the size of the board and its winning lines
+    """
+
+    __slots__ = ('x', 'o', 'variant')
+
+    def __init__(self, x=0, o=0, variant=CLASSIC):
+        """
+        :param x: The mask of the cells owned by 'X'.
+        :param o: The mask of the cells owned by 'O'.
+        :param variant: The Variant of the board, by default 3x3 with three in a row.
+        """
+        self.x = x
+        self.o = o
+        self.variant = variant
+
+    @classmethod
+    def from_cells(cls, cells, variant=CLASSIC):
+        """
+        :param cells: A sequence of markers, one per cell of the variant.
+        :param variant: The Variant of the board.
+        :return: A new Board holding the same position.
+        """
+        board = cls(variant=variant)
+        for i, cell in enumerate(cells):
+            if cell != EMPTY_MARKER:
+                board[i] = cell
+        return board
+
+    def __getitem__(self, i):
+        bit = 1 << i
+        if self.x & bit:
+            return PLAYER_MARKER
+        if self.o & bit:
+            return AI_MARKER
+        return EMPTY_MARKER
+
+    def __setitem__(self, i, marker):
+        bit = 1 << i
+        self.x &= ~bit
+        self.o &= ~bit
+        if marker == PLAYER_MARKER:
+            self.x |= bit
+        elif marker == AI_MARKER:
+            self.o |= bit
+
+    def __len__(self):
+        return self.variant.cells
+
+    def __iter__(self):
+        return (self[i] for i in range(self.variant.cells))
+
+    def __contains__(self, marker):
+        if marker == EMPTY_MARKER:
+            return self.empty_mask() != 0
+        return self.mask(marker) != 0
+
+    def __eq__(self, other):
+        return (isinstance(other, Board) and self.x == other.x and self.o == other.o
+                and self.variant is other.variant)
+
+    def __hash__(self):
+        return hash((self.x, self.o))
+
+    def __repr__(self):
+        if self.variant is CLASSIC:
+            return f"Board({''.join(self)!r})"
+        return f"Board({''.join(self)!r}, {self.variant!r})"
+
+    def copy(self):
+        """
+        :return: An independent copy of the board.
+        """
+        return Board(self.x, self.o, self.variant)
+
+    def mask(self, marker):
+        """
+        :param marker: 'X' or 'O'.
+        :return: The mask of the cells owned by that player.
+        """
+        return self.x if marker == PLAYER_MARKER else self.o
+
+    def empty_mask(self):
+        """
+        :return: The mask of the empty cells.
+        """
+        return self.variant.full_mask & ~(self.x | self.o)
+
+    def legal_moves(self):
+        """
+        :return: The indexes of the empty cells, in ascending order.
+        """
+        return cells_of(self.empty_mask())
+
+    def index(self):
+        """
+        :return: The base-3 index of the board, where cell i contributes 3 ** i for 'X' and 2 * 3 ** i for 'O'.
+        """
+        if self.variant is CLASSIC:
+            return BASE3[self.x] + 2 * BASE3[self.o]
+        return self.variant.base3(self.x) + 2 * self.variant.base3(self.o)
+
+    def winner(self):
+        """
+        Checks if there is a winner or a tie.
+
+        :return: The marker of the winner if there is a winner, 'Tie' if the board is full, or False if the game is
+        still running.
+        """
+        variant = self.variant
+        if variant is CLASSIC:
+            if WINNING[self.x]:
+                return PLAYER_MARKER
+            if WINNING[self.o]:
+                return AI_MARKER
+        else:
+            if variant.is_win(self.x):
+                return PLAYER_MARKER
+            if variant.is_win(self.o):
+                return AI_MARKER
+        if self.x | self.o == variant.full_mask:
+            return 'Tie'
+        return False
+
+
+def canonical(mover, waiting):
+    """
+    Reduces a position to the smallest of its 8 symmetric variants.
+
+    :param mover: The mask of the player to move.
+    :param waiting: The mask of the other player.
+    :return: An integer that is identical for all symmetric positions.
+    """
+    return min([table[mover] << CELLS | table[waiting] for table in SYMMETRY_TABLES])
+
+
+class TranspositionTable:
+    """
+    A bounded cache of minimax scores shared by every search in the process.
+
+    Positions are reduced to a canonical form under the 8 symmetries of the square before they are used as keys, so
+    rotated or mirrored positions share one entry. When the table is full the least recently used entry is evicted.
+
+    Attributes:
+    - max_size: The maximum number of entries kept in the table
+    - hits: The number of lookups answered from the table
+    - misses: The number of lookups that had to be searched
+    """
+
+    def __init__(self, max_size=TRANSPOSITION_TABLE_SIZE):
+        """
+        :param max_size: The maximum number of entries kept before the least recently used one is evicted.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """
+        Looks up a score and marks the entry as recently used.
+
+        :param key: A key returned by canonical().
+        :return: The stored entry, or None if the key is not in the table.
+        """
+        score = self._entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def store(self, key, score):
+        """
+        Stores a score, evicting the least recently used entry if the table is full.
+
+        :param key: A key returned by canonical().
+        :param score: The minimax score of the position, or any other entry describing it.
+        :return: None
+        """
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit/miss counters.
+
+        :return: None
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        :return: A dictionary with the number of entries, hits and misses of the table.
+        """
+        return {"Entries": len(self._entries), "Hits": self.hits, "Misses": self.misses}
+
+
+SearchResult = namedtuple('SearchResult', ['move', 'score', 'nodes'])
+
+transposition_table = TranspositionTable()
+alphabeta_table = TranspositionTable()
+
+
+def negamax(mover, waiting, table=transposition_table):
+    """
+    Scores a position for the player to move with the minimax algorithm.
+
+    :param mover: The mask of the player to move.
+    :param waiting: The mask of the player who moved last.
+    :param table: The TranspositionTable caching scores, or None to search without a cache.
+    :return: 1 if the player to move wins with perfect play, -1 if they lose and 0 for a draw.
+    """
+    if WINNING[waiting]:
+        return -1
+    free = FULL_MASK ^ (mover | waiting)
+    if not free:
+        return 0
+    return _negamax(mover, waiting, free, table)
+
+
+def _negamax(mover, waiting, free, table):
+    """
+    Scores a position that is not finished yet. Wins of a child are detected in the parent, and the last two plies
+    are resolved without further calls.
+    """
+    moves = MOVE_BITS[free]
+    if len(moves) == 1:
+        return WINNING[mover | free]
+    if len(moves) == 2:
+        a, b = moves
+        if WINNING[mover | a] or WINNING[mover | b]:
+            return 1
+        if WINNING[waiting | a] and WINNING[waiting | b]:
+            return -1
+        return 0
+
+    key = None
+    if table is not None and len(moves) >= CACHE_MIN_EMPTY:
+        key = canonical(mover, waiting)
+        cached = table.lookup(key)
+        if cached is not None:
+            return cached
+
+    best_score = -1
+    for bit in moves:
+        child = mover | bit
+        if WINNING[child]:
+            score = 1
+        else:
+            score = -_negamax(waiting, child, free ^ bit, table)
+        if score > best_score:
+            best_score = score
+
+    if key is not None:
+        table.store(key, best_score)
+    return best_score
+
+
+def minimax(board, isMaximizing, table=transposition_table):
+    """
+    Returns the optimal score of a board from the point of view of 'O'.
+
+    :param board: The Board to score.
+    :param isMaximizing: True if 'O' is to move, False if 'X' is to move.
+    :param table: The TranspositionTable caching scores, or None to search without a cache.
+    :return: 1 if 'O' wins with perfect play, -1 if 'X' wins and 0 for a draw.
+    """
+    if isMaximizing:
+        return negamax(board.o, board.x, table)
+    return -negamax(board.x, board.o, table)
+
+
+class AlphaBetaSearch:
+    """
+    The Hard AI search: negamax with alpha-beta pruning, center/corner/edge move ordering and depth-aware scores.
+
+    A win scores the number of empty cells left on the board plus one and a loss the negative of that, so the search
+    prefers the fastest win and the slowest loss. Draws score 0.
+
+    The search is exact and only used for the 3x3 board; larger boards are searched by IterativeDeepeningSearch.
+
+    Attributes:
+    - table: The TranspositionTable caching (score, bound) entries, or None to search without a cache
+    - nodes: The number of positions visited since the search was created
+    """
+
+    def __init__(self, table=alphabeta_table):
+        """
+        :param table: The TranspositionTable caching (score, bound) entries, or None to search without a cache.
+        """
+        self.table = table
+        self.nodes = 0
+
+    def search(self, board, marker):
+        """
+        Searches the best move for a player.
+
+        Moves are tried center first, then corners, then edges, and ties go to the move tried first.
+
+        :param board: The Board to search.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A SearchResult with the move, its score and the number of positions visited for it.
+        """
+        nodes = self.nodes
+        mover = board.mask(marker)
+        waiting = board.mask(opponent(marker))
+        free = board.empty_mask()
+        empties = free.bit_count()
+        alpha = -WIN_SCORE
+        move = None
+        for bit in ORDERED_MOVE_BITS[free]:
+            self.nodes += 1
+            child = mover | bit
+            if WINNING[child]:
+                score = empties
+            elif empties == 1:
+                score = 0
+            else:
+                score = -self._search(waiting, child, free ^ bit, -WIN_SCORE, -alpha)
+            if move is None or score > alpha:
+                alpha = score
+                move = bit.bit_length() - 1
+        return SearchResult(move, alpha, self.nodes - nodes)
+
+    def _search(self, mover, waiting, free, alpha, beta):
+        """
+        Scores a position that is not finished yet within the window (alpha, beta).
+        """
+        moves = ORDERED_MOVE_BITS[free]
+        empties = len(moves)
+        table = self.table
+        key = None
+        if table is not None and empties >= CACHE_MIN_EMPTY:
+            key = canonical(mover, waiting)
+            entry = table.lookup(key)
+            if entry is not None:
+                score, bound = entry
+                if bound == EXACT:
+                    return score
+                if bound == LOWER_BOUND and score > alpha:
+                    alpha = score
+                elif bound == UPPER_BOUND and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE
+        visited = 0
+        for bit in moves:
+            visited += 1
+            child = mover | bit
+            if WINNING[child]:
+                best_score = empties
+                break
+            if empties == 1:
+                score = 0
+            else:
+                score = -self._search(waiting, child, free ^ bit, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self.nodes += visited
+
+        if key is not None:
+            if best_score <= original_alpha:
+                bound = UPPER_BOUND
+            elif best_score >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(key, (best_score, bound))
+        return best_score
+
+
+def search(board, marker, table=alphabeta_table):
+    """
+    Runs the Hard AI search for a player.
+
+    :param board: The Board to search.
+    :param marker: The marker of the player to move ('X' or 'O').
+    :param table: The TranspositionTable caching (score, bound) entries, or None to search without a cache.
+    :return: A SearchResult with the move, its score and the number of positions visited.
+    """
+    return AlphaBetaSearch(table).search(board, marker)
+
+
+def best_move(board, marker, table=alphabeta_table):
+    """
+    :param board: The Board to search.
+    :param marker: The marker of the player to move ('X' or 'O').
+    :param table: The TranspositionTable caching (score, bound) entries, or None to search without a cache.
+    :return: The index of the cell the Hard AI plays.
+    """
+    return search(board, marker, table).move
@@ -0,0 +1,384 @@
+import random
+
+from . import engine
+from .book import get_opening_book
+from .database import get_database
+from .deepening import DEFAULT_TIME_BUDGET, IterativeDeepeningSearch
+from .engine import MOVE_BITS, Board, PLAYER_MARKER, AI_MARKER, cells_of, opponent
+from .history import HistoryWriter
+from .instrument import Tracer
+from .mcts import DEFAULT_PLAYOUTS, MonteCarloSearch, get_value_table
+from .stats import StatisticsStore
+from .variant import CLASSIC, Variant
+
+
+class Game:
+    """
+     The Tic Tac Toe game against the AI, without any user interface.
+
+     Attributes:
+     - data_file: The filename of the JSON file to store game statistics
+     - store: The StatisticsStore keeping the statistics on disk
+     - difficulty: The difficulty level of the AI player ('Easy', 'Medium', 'Hard' or 'MCTS')
+     - variant: The Variant giving the board size and the number of marks in a row that win
+     - time_budget: The seconds the Hard AI may think about a move on boards other than 3x3
+     - playouts: The number of random games the MCTS AI plays per move
+     - board: A Board holding one bit mask per player
+     - statistics: A dictionary containing game statistics
+     - moves: The cells played in the current game, in order
+     - history: The HistoryWriter recording every finished game, or None
+     - last_search: The SearchResult of the last Hard AI move, including the number of positions searched
+     - last_source: Where the last Hard AI move came from: 'book', 'database' or 'search'
+     - rng: The random.Random the Easy, Medium and MCTS AI draw their moves from
+     - tracer: The Tracer recording every AI move, or None to run the AI without instrumentation
+     - workers: The number of processes the Hard AI searches with on boards other than 3x3, or None for one
+     - parallel: The ParallelSearch holding those processes, started with the game and stopped by close()
+
+     Methods:
+     - play(self, i, ch): Marks a cell for a player
+     - random_cell(self): Draws an empty cell
+     - check_for_win(self): Checks if there is a winner or a tie
+     - record_result(self, winner): Counts a finished game in the statistics and the history
+     - ai_move(self, ch): Makes a move for the AI player on the selected difficulty level
+     - stored_move(self, ch): Reads the Hard AI move from the opening book or a database, without searching
+     - reset_game(self): Clears the board
+     - set_variant(self, size, win_length): Changes the board size and win length and starts a new game
+     - reset_statistics(self): Resets the game statistics to default
+     - load_data(self): Loads the game statistics from the statistics store
+     - save_data(self): Writes a snapshot of the game statistics
+     - close(self): Stops the search processes, flushes the statistics and closes the history and trace files
+    """
+
+    def __init__(self, difficulty="Easy", data_file="tttdata.json", history_file=None, size=3, win_length=None,
+                 time_budget=DEFAULT_TIME_BUDGET, seed=None, trace_file=None, workers=None, playouts=DEFAULT_PLAYOUTS):
+        """
+        :param difficulty: The difficulty level of the AI player ('Easy', 'Medium', 'Hard' or 'MCTS').
+        :param data_file: The filename of the JSON file to store game statistics, or None to keep them in memory.
+        :param history_file: The filename of the binary file recording the moves of every game, or None. Only 3x3
+        games are recorded.
+        :param size: The number of rows and columns of the board.
+        :param win_length: The number of marks in a row that win, by default the size.
+        :param time_budget: The seconds the Hard AI may think about a move on boards other than 3x3.
+        :param seed: The seed of the random number generator of the AI, or None for an unpredictable one.
+        :param trace_file: The filename of a JSON lines file to append a record of every AI move to, or None.
+        :param workers: The number of processes the Hard AI searches with on boards other than 3x3, or None to
+        search in this process. The processes are started here, so their startup does not count against the time
+        budget of the first move; call close() or use the game as a context manager to stop them.
+        :param playouts: The number of random games the MCTS AI plays per move.
+        """
+        self.data_file = data_file
+        self.difficulty = difficulty
+        self.variant = Variant.get(size, win_length)
+        self.time_budget = time_budget
+        self.playouts = playouts
+        self.board = Board(variant=self.variant)
+        self.moves = []
+        self.store = StatisticsStore(data_file)
+        self.statistics = self.load_data()
+        self.history = HistoryWriter(history_file) if history_file is not None else None
+        self.last_search = None
+        self.last_source = None
+        self.rng = random.Random(seed)
+        self.tracer = Tracer(trace_file) if trace_file is not None else None
+        self.workers = workers
+        self.parallel = None
+        if workers and workers > 1:
+            # Imported here, as only games searching on several processes need multiprocessing
+            from .parallel import ParallelSearch
+            self.parallel = ParallelSearch(workers, time_budget)
+
+    def copy(self):
+        """
+        Creates a game with a copy of the board and the same difficulty level that never writes statistics, so an AI
+        move can be computed on it in another thread. The copy draws from the same random number generator, so a
+        seeded game plays the same moves either way, and records its moves with the same tracer and searches with the
+        same processes, which stay owned by this game.
+
+        :return: A new Game.
+        """
+        game = Game(self.difficulty, data_file=None, size=self.variant.size, win_length=self.variant.win_length,
+                    time_budget=self.time_budget, playouts=self.playouts)
+        game.board = self.board.copy()
+        game.moves = list(self.moves)
+        game.rng = self.rng
+        game.tracer = self.tracer
+        game.workers = self.workers
+        game.parallel = self.parallel
+        return game
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stops the search processes, appends the results still queued to the statistics log and writes and closes the
+        history and trace files. Closing a game a copy was made of stops the processes of the copy as well.
+
+        :return: None
+        """
+        self.store.flush()
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.history is not None:
+            self.history.close()
+        if self.tracer is not None:
+            self.tracer.close()
+
+    def reset_statistics(self):
+        """
+        Resets the statistics for the TicTacToe game.
+
+        :return: None
+        """
+        self.store.reset()
+        self.statistics = self.store.statistics
+
+    def load_data(self):
+        """
+        Loads the game statistics from the statistics store.
+
+        :return: A dictionary containing the game statistics.
+        """
+        return self.store.statistics
+
+    def save_data(self):
+        """
+        Save the data of TicTacToe game as a new snapshot of the statistics store.
+
+        :return: None
+        """
+        self.store.compact()
+
+    def set_difficulty(self, value):
+        """
+        Sets the difficulty level of the AI player and starts a new game.
+
+        :param value: 'Easy', 'Medium', 'Hard' or 'MCTS'.
+        :return: None
+        """
+        self.difficulty = value
+        self.reset_game()
+
+    def reset_game(self):
+        """
+        Clears the board for a new game.
+
+        :return: None
+        """
+        self.board = Board(variant=self.variant)
+        self.moves = []
+
+    def set_variant(self, size, win_length=None):
+        """
+        Changes the board size and the number of marks in a row that win, and starts a new game.
+
+        :param size: The number of rows and columns of the board.
+        :param win_length: The number of marks in a row that win, by default the size.
+        :return: None
+        """
+        self.variant = Variant.get(size, win_length)
+        self.reset_game()
+
+    def play(self, i, ch):
+        """
+        Marks a cell for a player and remembers the move for the game history.
+
+        :param i: The index of the cell.
+        :param ch: The character representing the player's piece ('X' or 'O').
+        :return: None
+        """
+        self.board[i] = ch
+        self.moves.append(i)
+
+    def check_for_win(self):
+        """
+        Checks if there is a winner or a tie in the Tic Tac Toe game.
+
+        :return: Returns the marker of the winner if there is a winner, 'Tie' if the game is tied, or False if there
+        is no winner yet.
+        """
+        return self.board.winner()
+
+    def record_result(self, winner):
+        """
+        Counts a finished game in the statistics of the current difficulty level and appends it to the log and, if
+        enabled, to the game history.
+
+        :param winner: The result returned by check_for_win().
+        :return: The statistics key that was increased ('Wins', 'Losses' or 'Draws').
+        """
+        if winner == PLAYER_MARKER:
+            outcome = "Wins"
+        elif winner == AI_MARKER:
+            outcome = "Losses"
+        else:
+            outcome = "Draws"
+        self.store.record(self.difficulty, outcome)
+        if self.history is not None and self.moves and self.variant is CLASSIC:
+            self.history.write(self.moves, "Human", self.difficulty, self.board[self.moves[0]], winner)
+        return outcome
+
+    def random_cell(self):
+        """
+        Draws an empty cell from the random number generator of the game. On the 3x3 board the empty cells of every
+        position are precomputed, so a draw takes the same time however full the board is.
+
+        :return: The index of the cell.
+        """
+        free = self.board.empty_mask()
+        if self.variant is CLASSIC:
+            return self.rng.choice(MOVE_BITS[free]).bit_length() - 1
+        return self.rng.choice(cells_of(free))
+
+    def ai_move_easy(self, ch):
+        """
+        Makes a random move for the AI player in an easy difficulty level.
+
+        :param ch: The character representing the AI player's move.
+        :return: The index of the cell played.
+        """
+        i = self.random_cell()
+        self.play(i, ch)
+        return i
+
+    def ai_move_medium(self, ch):
+        """
+        Represents the medium level AI move in the Tic Tac Toe game.
+
+        :param ch: The player symbol ('X' or 'O') for which the AI will make a move.
+        :type ch: str
+        :return: The index of the cell played.
+
+        The AI completes a line of its own if it can, otherwise it blocks a line the opponent could complete. If
+        neither exists, it marks a random empty cell. Winning and blocking cells are found in one pass over the
+        lines of the board, and of several the one with the lowest index is played.
+        """
+        wins, blocks = self.variant.threats(self.board.mask(ch), self.board.mask(opponent(ch)))
+        target = wins or blocks
+        if target:
+            i = (target & -target).bit_length() - 1
+        else:
+            i = self.random_cell()
+        self.play(i, ch)
+        return i
+
+    def stored_move(self, ch):
+        """
+        Reads the Hard AI move from the opening book on the 3x3 board, or from the win/draw/loss database of the
+        board, without searching. A move found is kept in last_search and last_source, like ai_move_hard() does, but
+        not played.
+
+        :param ch: The character representing the current player's piece ('X' or 'O')
+        :return: The index of the cell, or None if neither covers the position.
+        """
+        move = None
+        if ch == AI_MARKER and self.variant is CLASSIC:
+            book = get_opening_book()
+            if book is not None:
+                move = book.move(self.board)
+        if move is not None:
+            self.last_search = engine.SearchResult(move, None, 0)
+            self.last_source = "book"
+            return move
+        database = get_database(self.variant)
+        if database is not None:
+            move = database.best_move(self.board, ch)
+        if move is not None:
+            self.last_search = engine.SearchResult(move, database.score(self.board, ch), 0)
+            self.last_source = "database"
+        return move
+
+    def ai_move_hard(self, ch):
+        """
+            Make a move for the AI player in hard mode.
+
+            On the 3x3 board the move is read from the precomputed opening book when it covers the position, and on
+            any board with a win/draw/loss database next to the game from that database, read through mmap.
+            Otherwise the 3x3 board is searched with alpha-beta pruning, and other boards with iterative deepening
+            within time_budget, with the root moves split over the worker processes if there are several. The
+            result, including the number of positions searched, is kept in last_search, and where the move came from in
+            last_source. A database move is scored like the 3x3 search scores it, from the outcome and the number of
+            plies to the end the database holds.
+
+            :param ch: The character representing the current player's piece ('X' or 'O')
+            :return: The index of the cell played.
+        """
+        move = self.stored_move(ch)
+        if move is None:
+            # With a tracer, the same search runs, wrapped to count what it did
+            tracer = self.tracer
+            if self.variant is CLASSIC:
+                searcher = tracer.alphabeta_search() if tracer is not None else engine.AlphaBetaSearch()
+            elif self.parallel is not None:
+                self.parallel.time_budget = self.time_budget
+                searcher = tracer.parallel_search(self.parallel) if tracer is not None else self.parallel
+            elif tracer is not None:
+                searcher = tracer.deepening_search(self.variant, self.time_budget)
+            else:
+                searcher = IterativeDeepeningSearch(self.variant, self.time_budget)
+            self.last_search = searcher.search(self.board, ch)
+            self.last_source = "search"
+            move = self.last_search.move
+        self.play(move, ch)
+        return move
+
+    def ai_move_mcts(self, ch):
+        """
+        Makes a move for the AI player with a Monte Carlo tree search of playouts random games, guided by the value
+        table learned in self-play if one is shipped with the game. The result, with the number of playouts, is kept
+        in last_search.
+
+        :param ch: The character representing the current player's piece ('X' or 'O')
+        :return: The index of the cell played.
+        """
+        search = MonteCarloSearch(self.variant, self.playouts, self.rng, get_value_table())
+        self.last_search = search.search(self.board, ch)
+        move = self.last_search.move
+        self.play(move, ch)
+        return move
+
+    def ai_move(self, ch):
+        """
+        :param ch: The character representing the player ('X' or 'O')
+        :return: The index of the cell played.
+
+        This method determines the AI's move based on the difficulty level selected.
+        If the difficulty is set to 'Easy', the AI makes a random move.
+        If the difficulty is set to 'Medium', the AI uses a medium-level algorithm to determine its move.
+        If the difficulty is set to 'Hard', the AI uses a hard-level algorithm to determine its move.
+        If the difficulty is set to 'MCTS', the AI searches its move with a budget of random playouts.
+        With a tracer, the move is timed and recorded together with the counters of the search.
+        """
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.begin(self, ch)
+        if self.difficulty == 'Easy':
+            move = self.ai_move_easy(ch)
+        elif self.difficulty == 'Medium':
+            move = self.ai_move_medium(ch)
+        elif self.difficulty == 'Hard':
+            move = self.ai_move_hard(ch)
+        elif self.difficulty == 'MCTS':
+            move = self.ai_move_mcts(ch)
+        else:
+            return None
+        if tracer is not None:
+            tracer.end(self, ch, move)
+        return move
+
+    def minimax(self, board, depth, isMaximizing):
+        """
+        Returns the optimal score for the current state of the tic-tac-toe board using the minimax algorithm.
+
+        :param board: The current state of the tic-tac-toe board as a Board.
+        :param depth: The current depth of the minimax algorithm.
+        :param isMaximizing: A boolean flag indicating whether it is the maximizing player's turn or not.
+        :return: The optimal score for the current board state.
+
+        The search runs on the bit masks of the board, and scores are cached in the process-wide transposition
+        table, so repeated and symmetric positions are only searched once.
+        """
+        return engine.minimax(board, isMaximizing)
@@ -0,0 +1,159 @@
+import os
+import struct
+from collections import namedtuple
+
+from .engine import CELLS, PLAYER_MARKER, AI_MARKER
+
+HISTORY_MAGIC = b'TTTH'
+RECORD = struct.Struct('<I')
+# Every game is one 32-bit record:
+#   bits  0-3   number of moves
+#   bits  4-22  the moves, each as its position among the cells still empty, in mixed radix 9, 8, 7, ...
+#   bits 23-25  the player of 'X', bits 26-28 the player of 'O' (see PLAYERS)
+#   bit  29     1 if 'O' moved first
+#   bits 30-31  the outcome (see OUTCOME_CODES)
+PLAYERS = ("Human", "Easy", "Medium", "Hard", "Random", "MCTS")
+OUTCOME_CODES = {'Tie': 0, PLAYER_MARKER: 1, AI_MARKER: 2}
+OUTCOME_MARKERS = ('Tie', PLAYER_MARKER, AI_MARKER)
+READ_BLOCK = 1 << 16
+
+GameRecord = namedtuple('GameRecord', ['moves', 'x_player', 'o_player', 'first', 'winner'])
+
+
+def encode_game(moves, x_player, o_player, first, winner):
+    """
+    Packs a finished game into a 32-bit record.
+
+    :param moves: The cells played, in order.
+    :param x_player: Who played 'X', one of PLAYERS.
+    :param o_player: Who played 'O', one of PLAYERS.
+    :param first: The marker that moved first.
+    :param winner: The result returned by check_for_win(): 'X', 'O' or 'Tie'.
+    :return: The record as an integer.
+    """
+    empty = list(range(CELLS))
+    rank = 0
+    radix = 1
+    for cell in moves:
+        position = empty.index(cell)
+        del empty[position]
+        rank += position * radix
+        radix *= len(empty) + 1
+    return (len(moves) | rank << 4 | PLAYERS.index(x_player) << 23 | PLAYERS.index(o_player) << 26
+            | (first == AI_MARKER) << 29 | OUTCOME_CODES[winner] << 30)
+
+
+def decode_game(value):
+    """
+    Unpacks a record written by encode_game().
+
+    :param value: The record as an integer.
+    :return: A GameRecord.
+    """
+    length = value & 0xF
+    rank = value >> 4 & 0x7FFFF
+    empty = list(range(CELLS))
+    moves = []
+    for _ in range(length):
+        rank, position = divmod(rank, len(empty))
+        moves.append(empty.pop(position))
+    return GameRecord(tuple(moves), PLAYERS[value >> 23 & 0x7], PLAYERS[value >> 26 & 0x7],
+                      AI_MARKER if value >> 29 & 1 else PLAYER_MARKER, OUTCOME_MARKERS[value >> 30])
+
+
+class HistoryWriter:
+    """
+    Appends finished games to a history file as they are played.
+
+    Attributes:
+    - path: The history file
+    - flush_every: The number of games buffered before they are written
+    """
+
+    def __init__(self, path, flush_every=1):
+        """
+        :param path: The history file. It is created with a header if it does not exist yet, and a record cut off by
+        a crash is removed from its end.
+        :param flush_every: The number of games buffered before they are written to the file.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self._pending = bytearray()
+        self._count = 0
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < len(HISTORY_MAGIC):
+            with open(path, 'wb') as f:
+                f.write(HISTORY_MAGIC)
+        elif (size - len(HISTORY_MAGIC)) % RECORD.size:
+            with open(path, 'r+b') as f:
+                f.truncate(size - (size - len(HISTORY_MAGIC)) % RECORD.size)
+
+    def write(self, moves, x_player, o_player, first, winner):
+        """
+        Records one finished game. The parameters are the same as for encode_game().
+
+        :return: None
+        """
+        self.write_records(RECORD.pack(encode_game(moves, x_player, o_player, first, winner)))
+
+    def write_records(self, records):
+        """
+        Appends records that were already packed, for example by a worker process.
+
+        :param records: A bytes-like object holding whole 4-byte records.
+        :return: None
+        """
+        self._pending += records
+        self._count += len(records) // RECORD.size
+        if self._count >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered games to the file.
+
+        :return: None
+        """
+        if not self._pending:
+            return
+        with open(self.path, 'ab') as f:
+            f.write(self._pending)
+        self._pending.clear()
+        self._count = 0
+
+    def close(self):
+        """
+        Writes the buffered games to the file.
+
+        :return: None
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_history(path):
+    """
+    Iterates the games of a history file block by block, without loading the whole file.
+
+    A record cut off at the end of the file by a crash is skipped.
+
+    :param path: The history file.
+    :return: A generator of GameRecords.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(HISTORY_MAGIC)) != HISTORY_MAGIC:
+            raise ValueError(f"{path} is not a game history file")
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block:
+                return
+            usable = len(block) - len(block) % RECORD.size
+            for (value,) in RECORD.iter_unpack(block[:usable]):
+                yield decode_game(value)
+            if usable != len(block):
+                return
@@ -0,0 +1,291 @@
+"""
+Opt-in instrumentation of the AI moves.
+
+A Game with a Tracer times every ai_move() call and runs its Hard searches with the instrumented subclasses below,
+which count what the search did on top of the plain search. A search split over worker processes runs unchanged, and
+only the totals it reports are recorded. A Game without a tracer runs the plain searches, so
+instrumentation costs nothing unless it is switched on.
+"""
+import json
+import time
+
+from .deepening import IterativeDeepeningSearch
+from .engine import AlphaBetaSearch, alphabeta_table
+from .position import Position
+
+
+class SearchStats:
+    """
+    The counters of the searches of one AI move.
+
+    Attributes:
+    - nodes: The number of positions visited
+    - terminal_hits: The number of positions found won or full, where the search stops without looking further
+    - depth_histogram: A list with the number of positions searched at each ply below the root, starting at ply 1
+    - cache_hits: The number of transposition table lookups that found an entry
+    - cache_misses: The number of transposition table lookups that found none
+    - processes: The number of processes that searched
+    - finished_depth: The depth of the deepest finished iteration, for searches whose positions were not counted one
+    by one
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.terminal_hits = 0
+        self.depth_histogram = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.processes = 1
+        self.finished_depth = 0
+
+    @property
+    def max_depth(self):
+        """
+        :return: The deepest ply below the root at which a position was searched.
+        """
+        return max(len(self.depth_histogram), self.finished_depth)
+
+    def count_depth(self, ply):
+        """
+        Counts a position searched at a ply below the root.
+
+        :param ply: The number of moves between the root and the position, at least 1.
+        :return: None
+        """
+        histogram = self.depth_histogram
+        while len(histogram) < ply:
+            histogram.append(0)
+        histogram[ply - 1] += 1
+
+
+class InstrumentedAlphaBetaSearch(AlphaBetaSearch):
+    """
+    An AlphaBetaSearch that also fills a SearchStats. Every child the search visits is either finished or searched
+    with _search(), so the finished ones are the visited children minus the _search() calls.
+    """
+
+    def __init__(self, stats, table=alphabeta_table):
+        """
+        :param stats: The SearchStats to add to.
+        :param table: The TranspositionTable caching (score, bound) entries, or None to search without a cache.
+        """
+        super().__init__(table)
+        self.stats = stats
+        self._root_empties = 0
+        self._calls = 0
+
+    def search(self, board, marker):
+        self._root_empties = board.empty_mask().bit_count()
+        self._calls = 0
+        hits, misses = (self.table.hits, self.table.misses) if self.table is not None else (0, 0)
+        result = super().search(board, marker)
+        stats = self.stats
+        stats.nodes += result.nodes
+        stats.terminal_hits += result.nodes - self._calls
+        if self.table is not None:
+            stats.cache_hits += self.table.hits - hits
+            stats.cache_misses += self.table.misses - misses
+        return result
+
+    def _search(self, mover, waiting, free, alpha, beta):
+        self._calls += 1
+        self.stats.count_depth(self._root_empties - free.bit_count())
+        return super()._search(mover, waiting, free, alpha, beta)
+
+
+class CountingPosition(Position):
+    """
+    A Position that counts the moves which finish the game in a SearchStats.
+    """
+
+    __slots__ = ('stats',)
+
+    def make(self, cell):
+        won = super().make(cell)
+        if won or self.is_full():
+            self.stats.terminal_hits += 1
+        return won
+
+
+class InstrumentedIterativeDeepeningSearch(IterativeDeepeningSearch):
+    """
+    An IterativeDeepeningSearch that also fills a SearchStats. The histogram counts positions over all iterations.
+    """
+
+    def __init__(self, stats, variant, time_budget, table=None):
+        """
+        :param stats: The SearchStats to add to.
+        :param variant: The Variant of the boards to search.
+        :param time_budget: The seconds one search may take.
+        :param table: The TranspositionTable to cache positions in, or None for a new one.
+        """
+        super().__init__(variant, time_budget, table)
+        self.stats = stats
+        self._iteration = 0
+
+    def search(self, board, marker):
+        hits, misses = self.table.hits, self.table.misses
+        result = super().search(board, marker)
+        stats = self.stats
+        stats.nodes += result.nodes
+        stats.cache_hits += self.table.hits - hits
+        stats.cache_misses += self.table.misses - misses
+        return result
+
+    def new_position(self, board, marker):
+        position = CountingPosition.from_board(board, marker)
+        position.stats = self.stats
+        return position
+
+    def _root(self, position, near, moves, depth, empties):
+        self._iteration = depth
+        return super()._root(position, near, moves, depth, empties)
+
+    def _search(self, position, near, depth, alpha, beta, empties):
+        self.stats.count_depth(self._iteration - depth)
+        return super()._search(position, near, depth, alpha, beta, empties)
+
+
+class TracedParallelSearch:
+    """
+    Runs a ParallelSearch and counts the positions its workers visited and the depth it finished into a SearchStats.
+    The workers search in other processes, so the finished positions, the depth histogram and the cache lookups are
+    not counted.
+    """
+
+    def __init__(self, stats, search):
+        """
+        :param stats: The SearchStats to count into.
+        :param search: The ParallelSearch.
+        """
+        self.stats = stats
+        self.parallel = search
+
+    def search(self, board, marker):
+        """
+        :return: The SearchResult of ParallelSearch.search().
+        """
+        result = self.parallel.search(board, marker)
+        self.stats.nodes += result.nodes
+        self.stats.processes = self.parallel.workers
+        self.stats.finished_depth = self.parallel.depth
+        return result
+
+
+class Tracer:
+    """
+    Records every AI move of the games it is attached to: the position, the move, the wall time and the SearchStats
+    of the Hard searches.
+
+    Each record is a dictionary that is passed to the callbacks and, if a trace file is given, appended to it as one
+    line of JSON, so a session can be loaded into other tools line by line.
+
+    Attributes:
+    - session: The identifier written into every record of this tracer
+    - callbacks: The functions called with each record
+    - moves: The number of moves recorded
+    - last: The record of the last move, or None
+    """
+
+    def __init__(self, trace_file=None, callbacks=(), session=None):
+        """
+        :param trace_file: The filename of the JSON lines file to append the records to, or None.
+        :param callbacks: Functions to call with each record.
+        :param session: The identifier of the session, or None for a random one.
+        """
+        if session is None:
+            import uuid  # Only traced games need it, so it is not imported with the package
+            session = uuid.uuid4().hex
+        self.session = session
+        self.callbacks = list(callbacks)
+        self.moves = 0
+        self.last = None
+        self.stats = SearchStats()
+        self._file = open(trace_file, 'a', encoding='utf-8') if trace_file is not None else None
+        self._board = None
+        self._start = 0.0
+
+    def begin(self, game, marker):
+        """
+        Starts recording an AI move.
+
+        :param game: The Game the AI moves on.
+        :param marker: The marker of the AI.
+        :return: None
+        """
+        self.stats = SearchStats()
+        self._board = ''.join(game.board)
+        self._start = time.perf_counter()
+
+    def end(self, game, marker, move):
+        """
+        Finishes the record of an AI move and hands it to the callbacks and the trace file.
+
+        :param game: The Game the AI moved on.
+        :param marker: The marker of the AI.
+        :param move: The cell the AI played.
+        :return: The record.
+        """
+        wall_time = time.perf_counter() - self._start
+        stats = self.stats
+        hard = game.difficulty == 'Hard'
+        source = game.last_source if hard else None
+        self.moves += 1
+        record = {
+            "session": self.session,
+            "move_number": self.moves,
+            "time": time.time(),
+            "difficulty": game.difficulty,
+            "variant": game.variant.name,
+            "marker": marker,
+            "board": self._board,
+            "move": move,
+            "wall_time_us": wall_time * 1e6,
+            "book": source == "book",
+            "database": source == "database",
+            "score": game.last_search.score if hard else None,
+            "nodes": stats.nodes,
+            "nodes_per_second": stats.nodes / wall_time if wall_time else None,
+            "terminal_hits": stats.terminal_hits,
+            "max_depth": stats.max_depth,
+            "depth_histogram": stats.depth_histogram,
+            "cache_hits": stats.cache_hits,
+            "cache_misses": stats.cache_misses,
+            "processes": stats.processes,
+        }
+        self.last = record
+        for callback in self.callbacks:
+            callback(record)
+        if self._file is not None:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+        return record
+
+    def alphabeta_search(self):
+        """
+        :return: An InstrumentedAlphaBetaSearch counting into the current move.
+        """
+        return InstrumentedAlphaBetaSearch(self.stats)
+
+    def deepening_search(self, variant, time_budget):
+        """
+        :return: An InstrumentedIterativeDeepeningSearch counting into the current move.
+        """
+        return InstrumentedIterativeDeepeningSearch(self.stats, variant, time_budget)
+
+    def parallel_search(self, search):
+        """
+        :param search: The ParallelSearch the game searches with.
+        :return: A TracedParallelSearch running it and counting into the current move.
+        """
+        return TracedParallelSearch(self.stats, search)
+
+    def close(self):
+        """
+        Closes the trace file.
+
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,400 @@
+"""
+The Monte Carlo tree search behind the MCTS difficulty level, and the self-play training of its value table.
+"""
+import math
+import os
+import random
+import struct
+import zlib
+
+from .book import base_dir
+from .deepening import NEIGHBOURHOOD_MIN_SIZE
+from .engine import AI_MARKER, PLAYER_MARKER, WINNING, Board, SearchResult, cells_of
+from .position import zobrist_hash, zobrist_keys
+from .variant import CLASSIC
+
+DEFAULT_PLAYOUTS = 2000
+# The number of random games played from a leaf at once; the budget is spent in steps of this size
+PLAYOUT_BATCH = 8
+# The weight of the exploration term of UCB1
+EXPLORATION = 1.4
+# A position found in the value table starts with this many playouts' worth of its stored value
+PRIOR_VISITS = 20
+
+VALUE_MAGIC = b'TTTV'
+VALUE_HEADER = struct.Struct('<4sII')
+# The Zobrist hash of a position, its value for the player who moved into it scaled to VALUE_SCALE, and the number
+# of games the value was learned from
+VALUE_RECORD = struct.Struct('<QhH')
+VALUE_SCALE = 32767
+MAX_COUNT = 0xFFFF
+
+value_path = os.path.join(base_dir, 'tttvalues.bin')
+_value_table = None
+
+
+class ValueTable:
+    """
+    The values of positions learned in self-play, keyed by Zobrist hash, so one table can hold several board sizes.
+
+    The value of a position is the average result, 1 for a win, 0 for a draw and -1 for a loss, of the player who
+    moved into it. On disk every position takes VALUE_RECORD.size bytes.
+
+    Attributes:
+    - entries: A dictionary mapping the hash of a position to a tuple of its value and the number of games it was
+    learned from
+    """
+
+    def __init__(self, entries=None):
+        """
+        :param entries: A dictionary as in the entries attribute, or None for an empty table.
+        """
+        self.entries = entries if entries is not None else {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        :param key: The Zobrist hash of a position.
+        :return: A tuple of the value and the number of games, or None if the position was never seen.
+        """
+        return self.entries.get(key)
+
+    def update(self, key, result):
+        """
+        Adds the result of one game to the running average of a position. Once a position has been seen MAX_COUNT
+        times, the average turns into a moving one.
+
+        :param key: The Zobrist hash of the position.
+        :param result: 1, 0 or -1 for the player who moved into the position.
+        :return: None
+        """
+        value, count = self.entries.get(key, (0.0, 0))
+        count = min(count + 1, MAX_COUNT)
+        self.entries[key] = (value + (result - value) / count, count)
+
+    def save(self, path=value_path):
+        """
+        Writes the table to a file with a checksummed header, sorted by hash so the same table gives the same file.
+
+        :param path: The file to write.
+        :return: None
+        """
+        records = b''.join(VALUE_RECORD.pack(key, round(value * VALUE_SCALE), count)
+                           for key, (value, count) in sorted(self.entries.items()))
+        with open(path, 'wb') as f:
+            f.write(VALUE_HEADER.pack(VALUE_MAGIC, len(self.entries), zlib.crc32(records)))
+            f.write(records)
+
+    @classmethod
+    def load(cls, path=value_path):
+        """
+        Reads a table written by save().
+
+        :param path: The file to read.
+        :return: The ValueTable, or None if the file is missing or damaged.
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < VALUE_HEADER.size:
+            return None
+        magic, count, checksum = VALUE_HEADER.unpack_from(data)
+        records = data[VALUE_HEADER.size:]
+        if magic != VALUE_MAGIC or len(records) != count * VALUE_RECORD.size or zlib.crc32(records) != checksum:
+            return None
+        return cls({key: (value / VALUE_SCALE, games) for key, value, games in VALUE_RECORD.iter_unpack(records)})
+
+
+def get_value_table():
+    """
+    Loads the value table shipped next to the game on first use.
+
+    :return: The ValueTable, or None if it is missing or damaged.
+    """
+    global _value_table
+    if _value_table is None:
+        _value_table = ValueTable.load() or False
+    return _value_table or None
+
+
+class Node:
+    """
+    A position in the search tree.
+
+    Attributes:
+    - mover: The mask of the player to move
+    - waiting: The mask of the player who moved into the position
+    - turn: The player to move, 0 for 'X' and 1 for 'O'
+    - hash: The Zobrist hash of the position
+    - cell: The move that led to the position, None at the root
+    - result: 1 if the move into the position won, 0 if it filled the board, None if the game goes on
+    - visits: The number of playouts through the position, including the ones of its prior
+    - total: The sum of their results for the player who moved into the position
+    - children: The Nodes of the moves, or None until the position is expanded
+    """
+
+    __slots__ = ('mover', 'waiting', 'turn', 'hash', 'cell', 'result', 'visits', 'total', 'children')
+
+    def __init__(self, mover, waiting, turn, hash, cell=None, result=None):
+        self.mover = mover
+        self.waiting = waiting
+        self.turn = turn
+        self.hash = hash
+        self.cell = cell
+        self.result = result
+        self.visits = 0
+        self.total = 0.0
+        self.children = None
+
+
+class MonteCarloSearch:
+    """
+    A Monte Carlo tree search with a fixed number of playouts per move.
+
+    Every iteration walks down the tree by UCB1, expands the position it ends on and plays PLAYOUT_BATCH random games
+    from one of the new children, or scores the child directly if the game is over there. New positions found in the
+    value table start with its value as a prior, so a trained table makes a small budget go further. The move played
+    is the one searched most. On boards of NEIGHBOURHOOD_MIN_SIZE and more, the tree only holds moves next to a mark,
+    while the playouts fill the whole board.
+
+    Attributes:
+    - variant: The Variant of the boards to search
+    - playouts: The number of random games per move
+    - rng: The random.Random the playouts draw from
+    - table: The ValueTable giving the priors, or None
+    - exploration: The weight of the exploration term of UCB1
+    - nodes: The number of playouts since the search was created
+    """
+
+    def __init__(self, variant, playouts=DEFAULT_PLAYOUTS, rng=None, table=None, exploration=EXPLORATION):
+        """
+        :param variant: The Variant of the boards to search.
+        :param playouts: The number of random games per move.
+        :param rng: The random.Random to draw from, or None for a new unpredictable one.
+        :param table: The ValueTable giving the priors, or None to search without.
+        :param exploration: The weight of the exploration term of UCB1.
+        """
+        self.variant = variant
+        self.playouts = playouts
+        self.rng = rng if rng is not None else random.Random()
+        self.table = table
+        self.exploration = exploration
+        self.nodes = 0
+        self.restricted = variant.size >= NEIGHBOURHOOD_MIN_SIZE
+        self._keys = zobrist_keys(variant)
+        if variant is CLASSIC:
+            self._wins_with = lambda mask, cell: WINNING[mask]
+        else:
+            self._wins_with = variant.wins_with
+
+    def search(self, board, marker):
+        """
+        Searches the best move for a player with the budget of playouts.
+
+        :param board: The Board to search, which must not be finished.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A SearchResult with the move, its average result between -1 and 1 and the number of playouts.
+        """
+        root = self.tree(board, marker)
+        best = max(root.children, key=lambda child: child.visits)
+        return SearchResult(best.cell, best.total / best.visits if best.visits else 0.0, root.visits)
+
+    def tree(self, board, marker):
+        """
+        Spends the budget of playouts on a new tree.
+
+        :param board: The Board to search, which must not be finished.
+        :param marker: The marker of the player to move.
+        :return: The root Node.
+        """
+        root = self.root(board, marker)
+        while root.visits < self.playouts:
+            self.iterate(root)
+        self.nodes += root.visits
+        return root
+
+    def root(self, board, marker):
+        """
+        :param board: The Board to search.
+        :param marker: The marker of the player to move.
+        :return: The expanded root Node.
+        """
+        turn = 0 if marker == PLAYER_MARKER else 1
+        mover, waiting = (board.x, board.o) if turn == 0 else (board.o, board.x)
+        root = Node(mover, waiting, turn, zobrist_hash(board, marker))
+        self.expand(root)
+        return root
+
+    def moves(self, node):
+        """
+        :param node: A Node whose game goes on.
+        :return: The mask of the cells the tree holds moves for.
+        """
+        occupied = node.mover | node.waiting
+        free = self.variant.full_mask ^ occupied
+        if not self.restricted or not occupied:
+            return free
+        near = 0
+        for cell in cells_of(occupied):
+            near |= self.variant.neighbours[cell]
+        return free & near or free
+
+    def expand(self, node):
+        """
+        Creates the children of a node in random order, with their priors from the value table.
+
+        :param node: A Node whose game goes on.
+        :return: None
+        """
+        x_keys, o_keys, side_key = self._keys
+        cell_keys = o_keys if node.turn else x_keys
+        filled = (node.mover | node.waiting).bit_count() + 1
+        cells = cells_of(self.moves(node))
+        self.rng.shuffle(cells)
+        children = []
+        for cell in cells:
+            moved = node.mover | 1 << cell
+            if self._wins_with(moved, cell):
+                result = 1
+            elif filled == self.variant.cells:
+                result = 0
+            else:
+                result = None
+            child = Node(node.waiting, moved, node.turn ^ 1, node.hash ^ cell_keys[cell] ^ side_key, cell, result)
+            if self.table is not None:
+                prior = self.table.get(child.hash)
+                if prior is not None:
+                    value, games = prior
+                    child.visits = min(games, PRIOR_VISITS)
+                    child.total = value * child.visits
+            children.append(child)
+        node.children = children
+
+    def select(self, node):
+        """
+        :param node: An expanded Node.
+        :return: The child with the highest UCB1 value; children without visits come first.
+        """
+        log_visits = math.log(node.visits) if node.visits else 0.0
+        exploration = self.exploration
+        best = None
+        best_value = -math.inf
+        for child in node.children:
+            if not child.visits:
+                return child
+            value = child.total / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def iterate(self, root):
+        """
+        Runs one iteration from the root and adds its results along the path.
+
+        :param root: The expanded root Node.
+        :return: None
+        """
+        node = root
+        path = [root]
+        while node.children is not None:
+            node = self.select(node)
+            path.append(node)
+            if node.result is not None:
+                break
+        if node.result is not None:
+            value = node.result * PLAYOUT_BATCH
+        else:
+            if node.visits:
+                self.expand(node)
+                node = self.select(node)
+                path.append(node)
+            if node.result is not None:
+                value = node.result * PLAYOUT_BATCH
+            else:
+                value = -self.playout(node.mover, node.waiting, PLAYOUT_BATCH)
+        for node in reversed(path):
+            node.visits += PLAYOUT_BATCH
+            node.total += value
+            value = -value
+
+    def playout(self, mover, waiting, count):
+        """
+        Plays random games from a position to the end. Every game shuffles the empty cells once and lets the players
+        take them in turn until one completes a line.
+
+        :param mover: The mask of the player to move.
+        :param waiting: The mask of the other player.
+        :param count: The number of games.
+        :return: The sum of their results for the player to move.
+        """
+        cells = cells_of(self.variant.full_mask ^ (mover | waiting))
+        shuffle = self.rng.shuffle
+        wins_with = self._wins_with
+        total = 0
+        for _ in range(count):
+            shuffle(cells)
+            masks = [mover, waiting]
+            turn = 0
+            for cell in cells:
+                mask = masks[turn] | 1 << cell
+                if wins_with(mask, cell):
+                    total += -1 if turn else 1
+                    break
+                masks[turn] = mask
+                turn ^= 1
+        return total
+
+
+def self_play(search, board=None, marker=PLAYER_MARKER):
+    """
+    Plays one game of a search against itself and adds its result to the value table of the search.
+
+    Moves are drawn in proportion to how often the search visited them rather than always taking the most visited
+    one, so that training games vary.
+
+    :param search: The MonteCarloSearch, whose table must not be None.
+    :param board: The Board to start from, or None for an empty board of the variant of the search.
+    :param marker: The marker of the player to move first.
+    :return: The marker of the winner, or 'Tie'.
+    """
+    board = board.copy() if board is not None else Board(variant=search.variant)
+    visited = []
+    winner = board.winner()
+    while not winner:
+        root = search.tree(board, marker)
+        children = [child for child in root.children if child.visits]
+        child = search.rng.choices(children, weights=[child.visits for child in children])[0]
+        board[child.cell] = marker
+        visited.append((child.hash, marker))
+        marker = AI_MARKER if marker == PLAYER_MARKER else PLAYER_MARKER
+        winner = board.winner()
+    for key, mover in visited:
+        search.table.update(key, 0 if winner == 'Tie' else 1 if winner == mover else -1)
+    return winner
+
+
+def train(variant=CLASSIC, games=1000, playouts=200, table=None, seed=None, progress=None):
+    """
+    Trains a value table by self-play.
+
+    :param variant: The Variant to play on.
+    :param games: The number of games.
+    :param playouts: The number of playouts per move.
+    :param table: The ValueTable to go on training, or None for a new one.
+    :param seed: The seed of the random number generator, or None for an unpredictable one.
+    :param progress: A function called with the number of games played and the dictionary counting the results
+    after every game, or None.
+    :return: The ValueTable.
+    """
+    table = table if table is not None else ValueTable()
+    search = MonteCarloSearch(variant, playouts, random.Random(seed), table)
+    results = {PLAYER_MARKER: 0, AI_MARKER: 0, 'Tie': 0}
+    for number in range(1, games + 1):
+        results[self_play(search)] += 1
+        if progress is not None:
+            progress(number, results)
+    return table
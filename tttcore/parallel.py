@@ -0,0 +1,193 @@
+"""
+The Hard AI search split over a process pool at the root, for boards other than 3x3.
+"""
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .deepening import (DEFAULT_TIME_BUDGET, INFINITY, TIME_MARGIN, WIN_VALUE, IterativeDeepeningSearch,
+                        SearchTimeout)
+from .engine import Board, SearchResult
+from .variant import Variant
+
+# The best exact root score of the running iteration and the index of the move it belongs to, shared with the
+# workers; set in every worker by _start_worker()
+_bound = None
+# The search a worker keeps between the root moves of one ParallelSearch.search() call, and the id of that call
+_search = None
+_search_id = None
+
+
+def _start_worker(bound):
+    """
+    Stores the shared bound in a new worker process.
+    """
+    global _bound
+    _bound = bound
+
+
+def search_root_move(search_id, size, win_length, x, o, marker, cell, index, depth, deadline):
+    """
+    Scores one root move in a worker process.
+
+    The window of the move starts at the best exact score another worker found so far in this iteration. A move
+    before that one in the move order has to beat the score minus one, so that it wins a tie like it does in the
+    serial search, and a move after it has to beat the score itself.
+
+    :param search_id: The id of the ParallelSearch.search() call; the transposition table is kept between its
+    iterations and cleared for a new call.
+    :param cell: The move to score.
+    :param index: The position of the move in the move order of the iteration.
+    :param depth: The depth of the iteration.
+    :param deadline: The time.time() at which the search has to stop, or None for no limit.
+    :return: A tuple of the index, the score or None if the deadline passed, the bound the score had to beat (the
+    score is exact if it is higher) and the number of positions visited.
+    """
+    global _search, _search_id
+    variant = Variant.get(size, win_length)
+    if _search_id != search_id:
+        _search = IterativeDeepeningSearch(variant, None)
+        _search_id = search_id
+    search = _search
+    search._deadline = float('inf') if deadline is None else time.perf_counter() + deadline - time.time()
+    board = Board(x, o, variant)
+    nodes = search.nodes
+
+    with _bound.get_lock():
+        best, holder = _bound[0], _bound[1]
+    if best == -INFINITY:
+        lower = -INFINITY
+    else:
+        lower = best - 1 if index < holder else best
+    try:
+        score = search.score_move(search.new_position(board, marker), search.near_mask(board), cell, depth, lower,
+                                  board.empty_mask().bit_count())
+    except SearchTimeout:
+        return index, None, lower, search.nodes - nodes
+    if score > lower:
+        with _bound.get_lock():
+            if score > _bound[0] or (score == _bound[0] and index < _bound[1]):
+                _bound[0] = score
+                _bound[1] = index
+    return index, score, lower, search.nodes - nodes
+
+
+class ParallelSearch:
+    """
+    The Hard AI search of IterativeDeepeningSearch with the moves of the root position searched in parallel.
+
+    Every iteration searches the best move of the iteration before first, then sends the other root moves to the
+    process pool in the move order of the serial search. The workers share the best exact score found so far as the
+    lower bound of their windows. Of the moves that score exactly,
+    the best one wins, and of equal ones the move first in the order, so without a time limit the search returns
+    the same move and score as IterativeDeepeningSearch. With a time limit it may search deeper in the same time.
+
+    The workers are started and warmed up when the search is created, so that their startup is not taken from the
+    time budget of the first move, and kept until close() is called; a ParallelSearch is also a context manager that
+    closes it. A search after close() starts new workers within its own time budget.
+
+    Attributes:
+    - workers: The number of worker processes
+    - time_budget: The seconds one search may take, or None for no limit
+    - max_depth: The depth of the last iteration, or None for no limit
+    - nodes: The number of positions visited since the search was created
+    - depth: The depth of the deepest finished iteration of the last search
+    """
+
+    def __init__(self, workers=None, time_budget=DEFAULT_TIME_BUDGET, max_depth=None):
+        """
+        :param workers: The number of worker processes, or None for one per core.
+        :param time_budget: The seconds one search may take, or None to search without a time limit.
+        :param max_depth: The depth of the last iteration, or None to go on until the game tree is exhausted.
+        """
+        self.workers = workers or os.cpu_count()
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.depth = 0
+        self._bound = multiprocessing.Array('q', 2)
+        self._executor = None
+        self._search_ids = itertools.count()
+        self.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """
+        Starts the worker processes unless they are running, and waits until each has answered once.
+
+        :return: None
+        """
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_start_worker, initargs=(self._bound,))
+        # Submitted together, every task finds the other workers busy, so all processes are started
+        for future in [self._executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        """
+        Stops the worker processes.
+
+        :return: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def search(self, board, marker):
+        """
+        Searches the best move for a player within the time budget.
+
+        :param board: The Board to search, which must not be finished.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A SearchResult with the move, its score and the number of positions visited for it. The score is
+        None if not even the first iteration finished in time.
+        """
+        # Taken before anything else, so that restarting closed workers counts against the budget
+        deadline = None if self.time_budget is None else time.time() + self.time_budget * (1 - TIME_MARGIN)
+        self.start()
+        variant = board.variant
+        planner = IterativeDeepeningSearch(variant, None, max_depth=self.max_depth)
+        search_id = (os.getpid(), next(self._search_ids))
+        empties = board.empty_mask().bit_count()
+        moves = planner.root_moves(board)
+        move = moves[0]
+        score = None
+        nodes = 0
+        self.depth = 0
+        for depth in range(1, planner.last_depth(empties) + 1):
+            with self._bound.get_lock():
+                self._bound[0] = -INFINITY
+                self._bound[1] = len(moves)
+            tasks = [(search_root_move, search_id, variant.size, variant.win_length, board.x, board.o, marker, cell,
+                      index, depth, deadline) for index, cell in enumerate(moves)]
+            # The first move, the best one of the iteration before, is searched alone: its score usually stands, and
+            # with it as the bound the other moves are refuted quickly
+            results = [self._executor.submit(*tasks[0]).result()]
+            if results[0][1] is not None:
+                futures = [self._executor.submit(*task) for task in tasks[1:]]
+                results += [future.result() for future in futures]
+            nodes += sum(result[3] for result in results)
+            exact = {index: score for index, score, lower, _ in results if score is not None and score > lower}
+            finished = all(result[1] is not None for result in results)
+            # Like in the serial search, an unfinished iteration counts once the move searched first, the best one
+            # of the iteration before, has a score
+            if exact and (finished or results[0][1] is not None):
+                index = min(exact, key=lambda i: (-exact[i], i))
+                score, move = exact[index], moves[index]
+            if not finished:
+                break
+            self.depth = depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) > WIN_VALUE:
+                break
+        self.nodes += nodes
+        return SearchResult(move, score, nodes)
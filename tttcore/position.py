@@ -0,0 +1,242 @@
+import random
+
+from .engine import AI_MARKER, PLAYER_MARKER, cells_of
+
+# The markers in the order of the player numbers used by Position
+MARKERS = (PLAYER_MARKER, AI_MARKER)
+# Fixed so that a position has the same hash in every process
+ZOBRIST_SEED = 0x5A0B
+# A line only one player has marks in is worth LINE_WEIGHT ** n for n marks
+LINE_WEIGHT = 10
+
+_zobrist_keys = {}
+_line_deltas = {}
+
+
+def zobrist_keys(variant):
+    """
+    Returns the random keys of a variant, creating them on first use.
+
+    :param variant: The Variant.
+    :return: A tuple of the keys of every cell for 'X', the same for 'O', and the key of 'O' being to move.
+    """
+    keys = _zobrist_keys.get(variant)
+    if keys is None:
+        rng = random.Random(f"{ZOBRIST_SEED}:{variant.size}:{variant.win_length}")
+        keys = _zobrist_keys[variant] = (tuple(rng.getrandbits(64) for _ in range(variant.cells)),
+                                         tuple(rng.getrandbits(64) for _ in range(variant.cells)),
+                                         rng.getrandbits(64))
+    return keys
+
+
+def line_weights(win_length):
+    """
+    :param win_length: The number of marks in a row that win.
+    :return: The heuristic value of a line holding n marks of only one player, for n from 0 to win_length.
+    """
+    return tuple(LINE_WEIGHT ** count if count else 0 for count in range(win_length + 1))
+
+
+def line_value(weights, x_count, o_count):
+    """
+    :param weights: The values returned by line_weights().
+    :param x_count: The number of marks of 'X' in the line.
+    :param o_count: The number of marks of 'O' in the line.
+    :return: The heuristic value of the line for 'X'.
+    """
+    if o_count == 0:
+        return weights[x_count]
+    if x_count == 0:
+        return -weights[o_count]
+    return 0
+
+
+def line_deltas(variant):
+    """
+    Returns how the value of a line for 'X' changes when a player adds a mark to it, creating the table on first use.
+
+    :param variant: The Variant.
+    :return: For both players, a tuple indexed by own * (win_length + 1) + other, the mark counts of the line before
+    the move.
+    """
+    deltas = _line_deltas.get(variant)
+    if deltas is None:
+        k = variant.win_length
+        weights = line_weights(k)
+        deltas = [[0] * (k + 1) ** 2, [0] * (k + 1) ** 2]
+        for own in range(k):
+            for other in range(k + 1 - own):
+                slot = own * (k + 1) + other
+                deltas[0][slot] = line_value(weights, own + 1, other) - line_value(weights, own, other)
+                deltas[1][slot] = line_value(weights, other, own + 1) - line_value(weights, other, own)
+        deltas = _line_deltas[variant] = (tuple(deltas[0]), tuple(deltas[1]))
+    return deltas
+
+
+def zobrist_hash(board, marker):
+    """
+    Computes the hash of a board from scratch, the same value Position keeps up to date move by move.
+
+    :param board: The Board.
+    :param marker: The marker of the player to move ('X' or 'O').
+    :return: A 64-bit integer.
+    """
+    x_keys, o_keys, side_key = zobrist_keys(board.variant)
+    value = side_key if marker == AI_MARKER else 0
+    for cell in cells_of(board.x):
+        value ^= x_keys[cell]
+    for cell in cells_of(board.o):
+        value ^= o_keys[cell]
+    return value
+
+
+class Position:
+    """
+    A board for searching by making and unmaking moves in place.
+
+    Besides one mask per player, the position keeps a Zobrist hash, the number of marks each player has in every
+    line and a heuristic score. A move only updates the lines through its cell, so a win, a full board, the hash and
+    the score are all known right after the move without scanning the board.
+
+    Attributes:
+    - variant: The Variant of the board
+    - masks: The masks of the cells owned by 'X' and by 'O'
+    - turn: The player to move, 0 for 'X' and 1 for 'O'
+    - hash: The Zobrist hash of the marks and the player to move
+    - counts: For both players, the number of marks in every line of the variant
+    - score: The sum of the heuristic values of all lines for 'X'
+    - filled: The number of marked cells
+    - history: The cells played with make(), in order
+    """
+
+    __slots__ = ('variant', 'masks', 'turn', 'hash', 'counts', 'score', 'filled', 'history', '_keys', '_side_key',
+                 '_deltas', '_stride', '_lines_through')
+
+    def __init__(self, variant, x=0, o=0, turn=PLAYER_MARKER):
+        """
+        :param variant: The Variant of the board.
+        :param x: The mask of the cells owned by 'X'.
+        :param o: The mask of the cells owned by 'O'.
+        :param turn: The marker of the player to move.
+        """
+        self.variant = variant
+        self.masks = [0, 0]
+        self.turn = MARKERS.index(turn)
+        self.counts = ([0] * len(variant.lines), [0] * len(variant.lines))
+        self.score = 0
+        self.filled = 0
+        self.history = []
+        x_keys, o_keys, self._side_key = zobrist_keys(variant)
+        self._keys = (x_keys, o_keys)
+        self._deltas = line_deltas(variant)
+        self._stride = variant.win_length + 1
+        self._lines_through = variant.lines_through
+        self.hash = self._side_key if self.turn else 0
+        for player, mask in enumerate((x, o)):
+            for cell in cells_of(mask):
+                self._place(player, cell)
+
+    @classmethod
+    def from_board(cls, board, marker):
+        """
+        :param board: The Board.
+        :param marker: The marker of the player to move ('X' or 'O').
+        :return: A new Position holding the same marks.
+        """
+        return cls(board.variant, board.x, board.o, marker)
+
+    def _place(self, player, cell):
+        """
+        Marks a cell for a player and updates the hash, the line counts and the score. Returns True if the mark
+        completes a line.
+        """
+        self.masks[player] |= 1 << cell
+        self.hash ^= self._keys[player][cell]
+        self.filled += 1
+        own = self.counts[player]
+        other = self.counts[player ^ 1]
+        delta = self._deltas[player]
+        stride = self._stride
+        last = stride - 2
+        score = self.score
+        won = False
+        for line in self._lines_through[cell]:
+            count = own[line]
+            score += delta[count * stride + other[line]]
+            own[line] = count + 1
+            if count == last:
+                won = True
+        self.score = score
+        return won
+
+    def make(self, cell):
+        """
+        Marks a cell for the player to move and passes the turn.
+
+        :param cell: The index of an empty cell.
+        :return: True if the move wins the game.
+        """
+        # The same as _place(), written out because this runs at every node of a search
+        player = self.turn
+        self.turn = player ^ 1
+        self.masks[player] |= 1 << cell
+        self.hash ^= self._keys[player][cell] ^ self._side_key
+        self.filled += 1
+        self.history.append(cell)
+        own = self.counts[player]
+        other = self.counts[player ^ 1]
+        delta = self._deltas[player]
+        stride = self._stride
+        last = stride - 2
+        score = self.score
+        won = False
+        for line in self._lines_through[cell]:
+            count = own[line]
+            score += delta[count * stride + other[line]]
+            own[line] = count + 1
+            if count == last:
+                won = True
+        self.score = score
+        return won
+
+    def unmake(self):
+        """
+        Takes back the last move made with make().
+
+        :return: The index of the cell that was cleared.
+        """
+        cell = self.history.pop()
+        player = self.turn ^ 1
+        self.turn = player
+        self.masks[player] ^= 1 << cell
+        self.hash ^= self._keys[player][cell] ^ self._side_key
+        self.filled -= 1
+        own = self.counts[player]
+        other = self.counts[player ^ 1]
+        delta = self._deltas[player]
+        stride = self._stride
+        score = self.score
+        for line in self._lines_through[cell]:
+            count = own[line] - 1
+            own[line] = count
+            score -= delta[count * stride + other[line]]
+        self.score = score
+        return cell
+
+    def is_full(self):
+        """
+        :return: True if every cell is marked.
+        """
+        return self.filled == self.variant.cells
+
+    def empty_mask(self):
+        """
+        :return: The mask of the empty cells.
+        """
+        return self.variant.full_mask ^ (self.masks[0] | self.masks[1])
+
+    def evaluate(self):
+        """
+        :return: The heuristic score of the position for the player to move.
+        """
+        return -self.score if self.turn else self.score
@@ -0,0 +1,101 @@
+"""
+Solves every position of a small board bottom-up and writes the win/draw/loss database read by tttcore.database.
+
+This module needs NumPy and is therefore not imported by the tttcore package; import it as tttcore.retrograde.
+"""
+import numpy as np
+
+from .database import (DATABASE_HEADER, DATABASE_MAGIC, DISTANCE_MASK, DRAW, LOSS, MAX_CELLS, NO_RESULT,
+                       database_path, entry, key_entry, move_key)
+
+# Positions are decoded and solved in blocks of this many indexes
+CHUNK_SIZE = 3 ** 12
+
+# The key of the move leading to each possible entry, and the entry of a position for the key of its best move
+_MOVE_KEYS = np.array([move_key(value) for value in range(256)], dtype=np.int16)
+_KEY_ENTRIES = np.array([key_entry(key) for key in range(2 * (DISTANCE_MASK + 1) + DISTANCE_MASK)], dtype=np.uint8)
+
+
+def winning_masks(variant):
+    """
+    :param variant: The Variant.
+    :return: A bool array over all masks of cells, True where the mask contains a line.
+    """
+    masks = np.arange(1 << variant.cells, dtype=np.int32)
+    winning = np.zeros(len(masks), dtype=bool)
+    for line in variant.lines:
+        winning |= masks & line == line
+    return winning
+
+
+def solve(variant, path=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Solves every position of a variant by retrograde analysis and writes the database to a memory-mapped file.
+
+    A move adds a mark, which raises the base-3 index of the board, so the positions a move leads to always have
+    higher indexes. The indexes are therefore solved in chunks from the top down. Within a chunk, finished games are
+    scored first, then the open positions by the number of marks from the fullest down, each from the entries of
+    the positions its moves lead to. Only the chunk being solved is held in memory; the database is written through
+    the mapping, and the operating system pages it in and out.
+
+    :param variant: The Variant to solve, with at most MAX_CELLS cells.
+    :param path: The database file, or None for database_path(variant).
+    :param chunk_size: The number of indexes solved at a time.
+    :param progress: A function called with the number of indexes solved and the total after every chunk, or None.
+    :return: The path of the database.
+    """
+    cells = variant.cells
+    if cells > MAX_CELLS:
+        raise ValueError(f"A {variant.size}x{variant.size} board has too many positions for a database")
+    path = path if path is not None else database_path(variant)
+    count = 3 ** cells
+    with open(path, 'wb') as f:
+        f.write(DATABASE_HEADER.pack(DATABASE_MAGIC, variant.size, variant.win_length, count))
+        f.truncate(DATABASE_HEADER.size + count)
+    database = np.memmap(path, dtype=np.uint8, mode='r+', offset=DATABASE_HEADER.size, shape=(count,))
+
+    winning = winning_masks(variant)
+    powers = (3 ** np.arange(cells)).astype(np.int32)
+    bits = (1 << np.arange(cells)).astype(np.int32)
+    solved = 0
+    for start in reversed(range(0, count, chunk_size)):
+        indexes = np.arange(start, min(start + chunk_size, count), dtype=np.int32)
+        digits = (indexes[:, None] // powers % 3).astype(np.int8)
+        x_mask = (digits == 1).astype(np.int32) @ bits
+        o_mask = (digits == 2).astype(np.int32) @ bits
+        x_count = (digits == 1).sum(axis=1)
+        filled = x_count + (digits == 2).sum(axis=1)
+        # 'X' moves first, so it is to move whenever both players have as many marks
+        x_moves = 2 * x_count == filled
+        legal = x_moves | (2 * x_count == filled + 1)
+        mover_won = np.where(x_moves, winning[x_mask], winning[o_mask])
+        waiting_won = np.where(x_moves, winning[o_mask], winning[x_mask])
+        legal &= ~mover_won
+
+        entries = np.full(len(indexes), NO_RESULT, dtype=np.uint8)
+        entries[legal & waiting_won] = entry(LOSS, 0)
+        entries[legal & ~waiting_won & (filled == cells)] = entry(DRAW, 0)
+        database[start:start + len(indexes)] = entries
+        open_positions = legal & ~waiting_won & (filled < cells)
+        mover_digit = np.where(x_moves, 1, 2).astype(np.int32)
+        for marks in range(cells - 1, -1, -1):
+            rows = np.flatnonzero(open_positions & (filled == marks))
+            if not len(rows):
+                continue
+            best = np.full(len(rows), -1, dtype=np.int16)
+            moved = mover_digit[rows]
+            for cell in range(cells):
+                empty = rows[digits[rows, cell] == 0]
+                if not len(empty):
+                    continue
+                children = indexes[empty] + moved[digits[rows, cell] == 0] * powers[cell]
+                keys = _MOVE_KEYS[database[children]]
+                at = np.searchsorted(rows, empty)
+                best[at] = np.maximum(best[at], keys)
+            database[start + rows] = _KEY_ENTRIES[best]
+        solved += len(indexes)
+        if progress is not None:
+            progress(solved, count)
+    database.flush()
+    del database
+    return path
@@ -0,0 +1,15 @@
+import random
+
+
+def derive(seed, *keys):
+    """
+    Creates a random number generator whose stream only depends on a base seed and a path of keys, for example the
+    seed of a simulation, the index of a chunk and the player. The stream is the same in every process and on every
+    platform.
+
+    :param seed: The base seed.
+    :param keys: Integers or strings naming the stream below the seed.
+    :return: A new random.Random.
+    """
+    return random.Random(":".join(str(part) for part in (seed,) + keys))
+
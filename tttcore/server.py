@@ -0,0 +1,531 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from .deepening import DEFAULT_TIME_BUDGET
+from .engine import AI_MARKER, PLAYER_MARKER, Board, opponent
+from .game import Game
+from .stats import DIFFICULTIES
+from .variant import VARIANTS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+# The largest request body or WebSocket message accepted
+MAX_MESSAGE = 1 << 16
+MAX_HEADERS = 100
+# Characters accepted for an empty cell in a board string
+EMPTY_CELLS = " .-_"
+
+
+class RequestError(Exception):
+    """
+    A request the server cannot answer. The message is sent back to the client.
+    """
+
+
+def apply_mask(payload, mask):
+    """
+    :param payload: The bytes of a WebSocket frame.
+    :param mask: The 4-byte masking key.
+    :return: The payload XORed with the repeated key, which masks and unmasks alike.
+    """
+    length = len(payload)
+    key = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+
+def encode_frame(opcode, payload, mask=None):
+    """
+    :param opcode: The opcode of the frame, for example OP_TEXT.
+    :param payload: The bytes to send.
+    :param mask: The 4-byte masking key, required for frames sent by a client, or None for frames sent by a server.
+    :return: One complete, final WebSocket frame.
+    """
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    header = bytearray([0x80 | opcode])
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+    if mask:
+        header += mask
+        payload = apply_mask(payload, mask)
+    return bytes(header) + payload
+
+
+async def read_frame(reader):
+    """
+    Reads one WebSocket frame.
+
+    :param reader: The asyncio.StreamReader of the connection.
+    :return: A tuple of the FIN flag, the opcode and the unmasked payload.
+    """
+    head = await reader.readexactly(2)
+    length = head[1] & 0x7F
+    if length == 126:
+        (length,) = struct.unpack('!H', await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack('!Q', await reader.readexactly(8))
+    if length > MAX_MESSAGE:
+        raise RequestError("message too large")
+    mask = await reader.readexactly(4) if head[1] & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = apply_mask(payload, mask)
+    return bool(head[0] & 0x80), head[0] & 0x0F, payload
+
+
+async def read_message(reader, writer, mask=None):
+    """
+    Reads the next text or binary message, answering pings and joining fragmented messages on the way.
+
+    :param reader: The asyncio.StreamReader of the connection.
+    :param writer: The asyncio.StreamWriter of the connection.
+    :param mask: The masking key for the frames this side sends, None on the server.
+    :return: The payload of the message, or None once the other side has closed the connection.
+    """
+    message = bytearray()
+    while True:
+        fin, opcode, payload = await read_frame(reader)
+        if opcode == OP_CLOSE:
+            writer.write(encode_frame(OP_CLOSE, payload[:2], mask))
+            await writer.drain()
+            return None
+        if opcode == OP_PING:
+            writer.write(encode_frame(OP_PONG, payload, mask))
+            continue
+        if opcode == OP_PONG:
+            continue
+        message += payload
+        if len(message) > MAX_MESSAGE:
+            raise RequestError("message too large")
+        if fin:
+            return bytes(message)
+
+
+def websocket_accept(key):
+    """
+    :param key: The Sec-WebSocket-Key header of the handshake request.
+    :return: The value of the Sec-WebSocket-Accept header of the answer.
+    """
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+
+
+async def read_line(reader):
+    """
+    :param reader: The asyncio.StreamReader of the connection.
+    :return: The next line, with its line ending, or b'' at the end of the stream.
+    """
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # The line is longer than the limit of the reader
+        raise RequestError("request line or header too long")
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP/1.1 request.
+
+    :param reader: The asyncio.StreamReader of the connection.
+    :return: A tuple of the method, the path, a dictionary of the headers with lower-case names and the body, or
+    None if the client closed the connection.
+    """
+    line = await read_line(reader)
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise RequestError("malformed request line")
+    headers = {}
+    while True:
+        line = await read_line(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise RequestError("too many headers")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise RequestError("malformed Content-Length header")
+    if length < 0:
+        raise RequestError("malformed Content-Length header")
+    if length > MAX_MESSAGE:
+        raise RequestError("request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method, target.split('?', 1)[0], headers, body
+
+
+def encode_response(status, payload, keep_alive=True):
+    """
+    :param status: The HTTPStatus.
+    :param payload: The object sent as the JSON body.
+    :param keep_alive: False to ask the client to close the connection.
+    :return: The bytes of the HTTP response.
+    """
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+def parse_board(cells, variant):
+    """
+    :param cells: A string or list with one marker per cell; ' ', '.', '-' or '_' mark an empty cell.
+    :param variant: The Variant of the board.
+    :return: The Board.
+    """
+    if not isinstance(cells, (str, list)) or len(cells) != variant.cells:
+        raise RequestError(f"board must have {variant.cells} cells")
+    board = Board(variant=variant)
+    for i, cell in enumerate(cells):
+        if cell == PLAYER_MARKER or cell == AI_MARKER:
+            board[i] = cell
+        elif not isinstance(cell, str) or len(cell) != 1 or cell not in EMPTY_CELLS:
+            raise RequestError(f"unknown marker {cell!r} in cell {i}")
+    return board
+
+
+def check_turn(board, marker):
+    """
+    Checks that a board can occur in a game and that marker may move on it: the players' numbers of marks differ by
+    at most one, and the player with fewer marks is to move. With as many marks each, either player may be to move,
+    as either may have started.
+
+    :param board: The Board.
+    :param marker: The marker of the player to move ('X' or 'O').
+    :return: None
+    """
+    x_count = board.x.bit_count()
+    o_count = board.o.bit_count()
+    if abs(x_count - o_count) > 1:
+        raise RequestError(f"impossible board with {x_count} 'X' and {o_count} 'O'")
+    if x_count != o_count and (marker == PLAYER_MARKER) != (x_count < o_count):
+        raise RequestError(f"it is {opponent(marker)}'s turn, not {marker}'s")
+
+
+def compute_move(difficulty, size, win_length, x, o, marker, time_budget, seed, playouts):
+    """
+    Computes an AI move in a worker process of the server's executor.
+
+    :param seed: The seed of the random number generator of the move, drawn from the generator of the session's game
+    so that a seeded session plays the same moves every time.
+    :param playouts: The number of random games the MCTS AI plays.
+    :return: A tuple of the cell played and the number of positions searched.
+    """
+    game = Game(difficulty, data_file=None, size=size, win_length=win_length, time_budget=time_budget, seed=seed,
+                playouts=playouts)
+    game.board = Board(x, o, game.variant)
+    move = game.ai_move(marker)
+    return move, game.last_search.nodes if game.last_search is not None else 0
+
+
+class Session:
+    """
+    The game of one WebSocket connection.
+
+    Attributes:
+    - game: The Game being played; the client plays player_marker and the AI the other marker
+    - player_marker: The marker of the client
+    """
+
+    def __init__(self, server):
+        """
+        :param server: The GameServer computing the AI moves.
+        """
+        self.server = server
+        self.game = server.new_game()
+        self.player_marker = PLAYER_MARKER
+
+    async def handle(self, message):
+        """
+        Answers one message of the client.
+
+        Messages are JSON objects with a 'type':
+        - 'new': Starts a new game with the optional 'difficulty', 'size', 'win_length', 'seed' and 'first' (the
+          marker that moves first; the client plays 'X', so with 'O' the AI opens)
+        - 'play': Marks 'cell' for the client and answers with the AI move
+        - 'move': Answers like POST /move, without touching the session's game
+
+        :param message: The decoded message.
+        :return: The answer as a dictionary.
+        """
+        if not isinstance(message, dict):
+            raise RequestError("expected a JSON object")
+        kind = message.get('type')
+        if kind == 'move':
+            return await self.server.answer(message)
+        if kind == 'new':
+            self.game = self.server.new_game(message)
+            move = None
+            if message.get('first', PLAYER_MARKER) != self.player_marker:
+                move = await self.server.ai_move(self.game, opponent(self.player_marker))
+            return self.state(move)
+        if kind == 'play':
+            cell = message.get('cell')
+            if self.game.check_for_win():
+                raise RequestError("the game is over, send 'new' to start another one")
+            if not isinstance(cell, int) or not 0 <= cell < self.game.variant.cells or self.game.board[cell] != ' ':
+                raise RequestError(f"cell {cell!r} is not an empty cell")
+            self.game.play(cell, self.player_marker)
+            move = None
+            if not self.game.check_for_win():
+                move = await self.server.ai_move(self.game, opponent(self.player_marker))
+            return self.state(move)
+        raise RequestError(f"unknown message type {kind!r}")
+
+    def state(self, move):
+        """
+        :param move: The cell the AI just played, or None.
+        :return: The answer describing the session's game.
+        """
+        return {"type": "state", "move": move, "board": ''.join(self.game.board),
+                "status": self.game.check_for_win() or "running", "difficulty": self.game.difficulty}
+
+
+class GameServer:
+    """
+    Serves AI moves over HTTP and WebSocket, using only the standard library.
+
+    - GET /health answers with the number of open sessions and requests served
+    - POST /move takes a JSON object with 'board', and optionally 'difficulty', 'marker' (the player to move, 'O' by
+      default), 'size' and 'win_length', and answers with the AI's 'move', the new 'board' and the 'status' of the
+      game ('running', 'X', 'O' or 'Tie'). Boards with more than one mark more for one player, and markers of a player
+      with more marks than the other, are rejected
+    - GET /ws upgrades to a WebSocket with its own Session, see Session.handle()
+
+    Hard and MCTS searches run in a process pool so the event loop keeps answering other clients. Easy and Medium
+    moves, and Hard moves read from the opening book or a database, take microseconds and are computed on the loop.
+
+    Attributes:
+    - host: The address the server listens on
+    - port: The port the server listens on; 0 picks a free one, which is stored here once the server started
+    - workers: The number of search processes, or None for one per core
+    - time_budget: The seconds a Hard search may take on boards other than 3x3
+    - sessions: The number of open WebSocket sessions
+    - requests: The number of moves answered
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, time_budget=DEFAULT_TIME_BUDGET):
+        """
+        :param host: The address to listen on.
+        :param port: The port to listen on, or 0 for a free one.
+        :param workers: The number of search processes, or None for one per core.
+        :param time_budget: The seconds a Hard search may take on boards other than 3x3.
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.time_budget = time_budget
+        self.sessions = 0
+        self.requests = 0
+        self.executor = None
+        self._server = None
+
+    async def start(self):
+        """
+        Starts the search processes and begins to accept connections.
+
+        :return: None
+        """
+        self.executor = ProcessPoolExecutor(self.workers)
+        # Start the workers before the first connection is open; forked later, they would inherit the sockets of the
+        # open connections and keep them from closing
+        await asyncio.get_running_loop().run_in_executor(self.executor, os.getpid)
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Starts the server if needed and serves until the task is cancelled.
+
+        :return: None
+        """
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stops accepting connections and shuts the search processes down, waiting for the searches still running.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def new_game(self, options=None):
+        """
+        :param options: A dictionary with the optional 'difficulty', 'size', 'win_length' and 'seed' of the game. Only
+        the boards offered in the game (VARIANTS) are accepted, as building the lines of a large board would hold up
+        every connection.
+        :return: A Game that keeps no statistics.
+        """
+        options = options or {}
+        difficulty = options.get('difficulty', 'Easy')
+        if difficulty not in DIFFICULTIES:
+            raise RequestError(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+        try:
+            size = int(options.get('size', 3))
+            win_length = int(options['win_length']) if options.get('win_length') is not None else size
+        except (TypeError, ValueError) as error:
+            raise RequestError(str(error))
+        if (size, win_length) not in VARIANTS.values():
+            boards = ', '.join(f"{size}x{size} with {win_length} in a row" for size, win_length in VARIANTS.values())
+            raise RequestError(f"board must be one of {boards}")
+        try:
+            return Game(difficulty, data_file=None, size=size, win_length=win_length, time_budget=self.time_budget,
+                        seed=options.get('seed'))
+        except (TypeError, ValueError) as error:
+            raise RequestError(str(error))
+
+    async def ai_move(self, game, marker):
+        """
+        Plays the AI move for a marker on a game, searching Hard and MCTS moves in the process pool unless the Hard move
+        is stored in the opening book or a database. The seed of a move in the pool is drawn from the generator of the
+        game, so seeded games stay reproducible.
+
+        :param game: The Game.
+        :param marker: The marker of the AI.
+        :return: The cell played.
+        """
+        self.requests += 1
+        if game.difficulty not in ('Hard', 'MCTS'):
+            return game.ai_move(marker)
+        if game.difficulty == 'Hard':
+            move = game.stored_move(marker)
+            if move is not None:
+                game.play(move, marker)
+                return move
+        variant = game.variant
+        move, _ = await asyncio.get_running_loop().run_in_executor(
+            self.executor, compute_move, game.difficulty, variant.size, variant.win_length, game.board.x,
+            game.board.o, marker, game.time_budget, game.rng.getrandbits(64), game.playouts)
+        game.play(move, marker)
+        return move
+
+    async def answer(self, request):
+        """
+        Answers a stateless move request, see the class description.
+
+        :param request: The decoded JSON object.
+        :return: The answer as a dictionary.
+        """
+        if not isinstance(request, dict):
+            raise RequestError("expected a JSON object")
+        game = self.new_game(request)
+        game.board = parse_board(request.get('board'), game.variant)
+        marker = request.get('marker', AI_MARKER)
+        if marker not in (PLAYER_MARKER, AI_MARKER):
+            raise RequestError("marker must be 'X' or 'O'")
+        check_turn(game.board, marker)
+        move = None
+        if not game.check_for_win():
+            move = await self.ai_move(game, marker)
+        return {"move": move, "board": ''.join(game.board), "status": game.check_for_win() or "running"}
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves the requests of one connection until the client closes it.
+
+        :param reader: The asyncio.StreamReader of the connection.
+        :param writer: The asyncio.StreamWriter of the connection.
+        :return: None
+        """
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except RequestError as error:
+                    writer.write(encode_response(HTTPStatus.BAD_REQUEST, {"error": str(error)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                    await self.handle_websocket(reader, writer, headers)
+                    break
+                status, payload = await self.handle_http(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, RequestError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_http(self, method, path, body):
+        """
+        :return: A tuple of the HTTPStatus and the JSON payload of the answer to a plain HTTP request.
+        """
+        if path == '/health':
+            return HTTPStatus.OK, {"status": "ok", "sessions": self.sessions, "requests": self.requests}
+        if path != '/move':
+            return HTTPStatus.NOT_FOUND, {"error": f"no such path {path}"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "use POST"}
+        try:
+            return HTTPStatus.OK, await self.answer(json.loads(body or b'null'))
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": f"invalid JSON: {error}"}
+        except RequestError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+    async def handle_websocket(self, reader, writer, headers):
+        """
+        Completes the WebSocket handshake and answers the messages of the connection's Session.
+
+        :return: None
+        """
+        key = headers.get('sec-websocket-key')
+        if not key:
+            writer.write(encode_response(HTTPStatus.BAD_REQUEST, {"error": "missing Sec-WebSocket-Key"}, False))
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\n"
+                      "Connection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n").encode())
+        self.sessions += 1
+        try:
+            session = Session(self)
+            while True:
+                message = await read_message(reader, writer)
+                if message is None:
+                    return
+                try:
+                    reply = await session.handle(json.loads(message))
+                except ValueError as error:
+                    reply = {"type": "error", "error": f"invalid JSON: {error}"}
+                except RequestError as error:
+                    reply = {"type": "error", "error": str(error)}
+                writer.write(encode_frame(OP_TEXT, json.dumps(reply).encode()))
+                await writer.drain()
+        finally:
+            self.sessions -= 1
@@ -0,0 +1,127 @@
+import multiprocessing
+
+from .engine import PLAYER_MARKER, AI_MARKER, opponent
+from .game import Game
+from .history import RECORD, encode_game
+from .rng import derive
+
+CHUNK_SIZE = 500
+
+
+def ai_move_random(game, ch):
+    """
+    Marks a uniformly chosen empty cell, drawn from the random number generator of the game.
+
+    :param game: The Game to move in.
+    :param ch: The character representing the player's piece ('X' or 'O').
+    :return: The index of the cell played.
+    """
+    i = game.random_cell()
+    game.play(i, ch)
+    return i
+
+
+POLICIES = {
+    "Easy": Game.ai_move_easy,
+    "Medium": Game.ai_move_medium,
+    "Hard": Game.ai_move_hard,
+    "Random": ai_move_random,
+    "MCTS": Game.ai_move_mcts,
+}
+
+
+def play_game(game, first, second, first_marker=PLAYER_MARKER, rngs=None):
+    """
+    Plays one game between two policies on an empty board.
+
+    :param game: The Game whose board is used.
+    :param first: The name of the policy that moves first.
+    :param second: The name of the policy that moves second.
+    :param first_marker: The marker of the policy that moves first.
+    :param rngs: The random number generators of the first and the second policy, or None to let both draw from
+    the generator of the game.
+    :return: The marker of the winner, or 'Tie'.
+    """
+    game.reset_game()
+    players = ((POLICIES[first], first_marker), (POLICIES[second], opponent(first_marker)))
+    turn = 0
+    while True:
+        policy, marker = players[turn]
+        if rngs is not None:
+            game.rng = rngs[turn]
+        policy(game, marker)
+        winner = game.check_for_win()
+        if winner:
+            return winner
+        turn ^= 1
+
+
+def run_chunk(task):
+    """
+    Plays a chunk of games in a worker process.
+
+    Player A always plays 'X' and player B 'O'. Each player draws from its own random number generator, derived
+    from the base seed, the chunk index and the player, so a chunk plays the same games no matter which worker runs
+    it or what the other player draws.
+
+    :param task: A tuple (policy_a, policy_b, games, seed, chunk_index, alternate, record).
+    :return: A tuple of a dictionary counting 'A' wins, 'B' wins and 'Draws', and the packed history records of the
+    games if record is True, otherwise None.
+    """
+    policy_a, policy_b, games, seed, chunk_index, alternate, record = task
+    rng_a = derive(seed, chunk_index, "A")
+    rng_b = derive(seed, chunk_index, "B")
+    game = Game(data_file=None)
+    counts = {"A": 0, "B": 0, "Draws": 0}
+    records = bytearray() if record else None
+    for number in range(games):
+        if alternate and number % 2:
+            first = AI_MARKER
+            winner = play_game(game, policy_b, policy_a, AI_MARKER, (rng_b, rng_a))
+        else:
+            first = PLAYER_MARKER
+            winner = play_game(game, policy_a, policy_b, PLAYER_MARKER, (rng_a, rng_b))
+        if record:
+            records += RECORD.pack(encode_game(game.moves, policy_a, policy_b, first, winner))
+        if winner == PLAYER_MARKER:
+            counts["A"] += 1
+        elif winner == AI_MARKER:
+            counts["B"] += 1
+        else:
+            counts["Draws"] += 1
+    return counts, records
+
+
+def simulate(policy_a, policy_b, games, workers=None, seed=0, alternate=False, chunk_size=CHUNK_SIZE, history=None):
+    """
+    Plays a tournament between two policies on a process pool and streams the running totals.
+
+    Chunks are collected in order, so the same seed gives the same running totals and the same history file, byte for
+    byte, for any number of workers.
+
+    :param policy_a: The name of the first policy ('Easy', 'Medium', 'Hard', 'Random' or 'MCTS'), playing 'X'.
+    :param policy_b: The name of the second policy, playing 'O'.
+    :param games: The number of games to play.
+    :param workers: The number of worker processes, or None for one per core.
+    :param seed: The base seed of the random number generators.
+    :param alternate: True to let the policies take turns in moving first, False to let policy A always start.
+    :param chunk_size: The number of games a worker plays per task.
+    :param history: A HistoryWriter recording the moves of every game, or None.
+    :return: A generator yielding the running totals as a dictionary after every finished chunk.
+    """
+    for name in (policy_a, policy_b):
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy {name!r}, expected one of {', '.join(POLICIES)}")
+    tasks = []
+    for chunk_index, start in enumerate(range(0, games, chunk_size)):
+        tasks.append((policy_a, policy_b, min(chunk_size, games - start), seed, chunk_index, alternate,
+                      history is not None))
+
+    totals = {"A": 0, "B": 0, "Draws": 0}
+    with multiprocessing.Pool(workers) as pool:
+        for counts, records in pool.imap(run_chunk, tasks):
+            if history is not None:
+                history.write_records(records)
+            for key, value in counts.items():
+                totals[key] += value
+            yield dict(totals)
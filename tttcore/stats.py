@@ -0,0 +1,160 @@
+import glob
+import json
+import os
+
+DIFFICULTIES = ("Easy", "Medium", "Hard", "MCTS")
+OUTCOMES = ("Wins", "Losses", "Draws")
+
+
+def default_statistics():
+    """
+    :return: A dictionary with zero wins, losses and draws for every difficulty level.
+    """
+    return {difficulty: {outcome: 0 for outcome in OUTCOMES} for difficulty in DIFFICULTIES}
+
+
+class StatisticsStore:
+    """
+    Crash-safe storage of the game statistics as a JSON snapshot plus an append-only log of game results.
+
+    Every result is appended to the log as one line. Once the log holds compact_every results, the totals are written
+    to a new snapshot, which atomically replaces the old one and names a fresh log, and the old log is deleted. A
+    crash at any point leaves either the old snapshot with its complete log or the new snapshot, and a line cut off
+    by a crash, or a damaged one, is skipped when the log is read back.
+
+    Attributes:
+    - path: The snapshot file, or None to keep the statistics in memory only
+    - statistics: A dictionary containing the game statistics
+    - flush_every: The number of results buffered in memory before they are appended to the log
+    - compact_every: The number of logged results after which a new snapshot is written
+    - durable: True to fsync the log after every append
+    """
+
+    def __init__(self, path="tttdata.json", flush_every=1, compact_every=1000, durable=True):
+        """
+        :param path: The snapshot file, or None to keep the statistics in memory only.
+        :param flush_every: The number of results buffered before they are appended to the log. Simulations recording
+        many results should use a large value.
+        :param compact_every: The number of logged results after which a new snapshot is written.
+        :param durable: True to fsync the log after every append, False to leave it to the operating system.
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.compact_every = compact_every
+        self.durable = durable
+        self.statistics = default_statistics()
+        self._generation = 0
+        self._logged = 0
+        self._pending = []
+        if path is not None:
+            self._load()
+
+    def log_path(self, generation=None):
+        """
+        :param generation: The generation of the log, or None for the current one.
+        :return: The path of the result log belonging to a snapshot generation.
+        """
+        if generation is None:
+            generation = self._generation
+        return f"{self.path}.{generation}.log"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.statistics.update(data["statistics"])
+            self._generation = data.get("log_generation", 0)
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError):
+            # Written by a version that rewrote the file in place and crashed; keep it for inspection. Its logs go
+            # with it: the generation they belong to is lost, and a later snapshot of that generation would count
+            # their results again
+            os.replace(self.path, self.path + ".corrupt")
+            for log in glob.glob(glob.escape(self.path) + ".*.log"):
+                os.replace(log, log + ".corrupt")
+
+        try:
+            with open(self.log_path(), 'rb') as f:
+                log = f.read()
+        except FileNotFoundError:
+            return
+        complete = log[:log.rfind(b'\n') + 1]
+        if len(complete) != len(log):
+            with open(self.log_path(), 'r+b') as f:
+                f.truncate(len(complete))
+        for line in complete.decode(errors='replace').splitlines():
+            self._logged += 1
+            fields = line.split()
+            if len(fields) != 2 or fields[1] not in OUTCOMES:
+                # A damaged record is skipped like a torn one, and dropped by the next compaction
+                continue
+            difficulty, outcome = fields
+            self.statistics.setdefault(difficulty, {key: 0 for key in OUTCOMES})[outcome] += 1
+
+    def record(self, difficulty, outcome):
+        """
+        Counts one game result and queues it for the log.
+
+        :param difficulty: The difficulty level the game was played on.
+        :param outcome: 'Wins', 'Losses' or 'Draws'.
+        :return: None
+        """
+        self.statistics[difficulty][outcome] += 1
+        if self.path is None:
+            return
+        self._pending.append(f"{difficulty} {outcome}\n")
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the queued results to the log, and writes a new snapshot if the log has grown past compact_every.
+
+        :return: None
+        """
+        if self.path is None or not self._pending:
+            return
+        with open(self.log_path(), 'a') as f:
+            f.write(''.join(self._pending))
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        self._logged += len(self._pending)
+        self._pending.clear()
+        if self._logged >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Writes the totals to a new snapshot that atomically replaces the old one, and deletes the old log.
+
+        :return: None
+        """
+        if self.path is None:
+            return
+        old_log = self.log_path()
+        self._pending.clear()
+        data = {"statistics": self.statistics, "log_generation": self._generation + 1}
+        temporary = self.path + ".tmp"
+        with open(temporary, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self._generation += 1
+        self._logged = 0
+        try:
+            os.remove(old_log)
+        except FileNotFoundError:
+            pass
+
+    def reset(self, statistics=None):
+        """
+        Replaces all statistics and writes them as a new snapshot.
+
+        :param statistics: The new statistics, or None for zero counts.
+        :return: None
+        """
+        self.statistics = statistics if statistics is not None else default_statistics()
+        self.compact()
@@ -0,0 +1,166 @@
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+# The board sizes and win lengths offered in the game
+VARIANTS = {
+    "3x3": (3, 3),
+    "4x4": (4, 4),
+    "5x5, four in a row": (5, 4),
+    "15x15 Gomoku": (15, 5),
+}
+
+
+class Variant:
+    """
+    The geometry of an n x n board on which k marks in a row win.
+
+    Cell i is row i // size, column i % size. Every line of win_length cells is stored as a bit mask, and the lines
+    through each cell are indexed so a move only has to be checked against the lines it can complete.
+
+    Attributes:
+    - size: The number of rows and columns
+    - win_length: The number of marks in a row needed to win
+    - cells: The number of cells
+    - full_mask: The mask with every cell set
+    - lines: The masks of all winning lines
+    - line_cells: For every line, the indexes of its cells
+    - lines_through: For every cell, the indexes into lines of the lines through it
+    - move_order: All cells, the ones on most lines first, then by distance to the center
+    - neighbours: For every cell, the mask of the cells around it
+    """
+
+    _variants = {}
+
+    def __init__(self, size=3, win_length=None):
+        """
+        :param size: The number of rows and columns.
+        :param win_length: The number of marks in a row needed to win, by default the size.
+        """
+        if win_length is None:
+            win_length = size
+        if size < 3 or not 3 <= win_length <= size:
+            raise ValueError(f"Unsupported board: {size}x{size} with {win_length} in a row")
+        self.size = size
+        self.win_length = win_length
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+
+        line_cells = []
+        for row in range(size):
+            for column in range(size):
+                for d_row, d_column in DIRECTIONS:
+                    end_row = row + d_row * (win_length - 1)
+                    end_column = column + d_column * (win_length - 1)
+                    if 0 <= end_row < size and 0 <= end_column < size:
+                        line_cells.append(tuple((row + d_row * step) * size + column + d_column * step
+                                                for step in range(win_length)))
+        self.line_cells = tuple(line_cells)
+        self.lines = tuple(sum(1 << cell for cell in cells) for cells in line_cells)
+        self.lines_through = tuple(tuple(index for index, cells in enumerate(line_cells) if cell in cells)
+                                   for cell in range(self.cells))
+        self._line_masks_through = tuple(tuple(self.lines[index] for index in indexes)
+                                         for indexes in self.lines_through)
+
+        center = (size - 1) / 2
+        self.move_order = tuple(sorted(range(self.cells), key=lambda cell: (
+            -len(self.lines_through[cell]),
+            (cell // size - center) ** 2 + (cell % size - center) ** 2,
+            cell)))
+        self.order_rank = tuple(self.move_order.index(cell) for cell in range(self.cells))
+        self.neighbours = tuple(
+            sum(1 << row * size + column
+                for row in range(max(0, cell // size - 1), min(size, cell // size + 2))
+                for column in range(max(0, cell % size - 1), min(size, cell % size + 2)))
+            for cell in range(self.cells))
+
+    @classmethod
+    def get(cls, size=3, win_length=None):
+        """
+        Returns the shared Variant for a board, creating it on first use.
+
+        :param size: The number of rows and columns.
+        :param win_length: The number of marks in a row needed to win, by default the size.
+        :return: The Variant.
+        """
+        key = (size, win_length if win_length is not None else size)
+        variant = cls._variants.get(key)
+        if variant is None:
+            variant = cls._variants[key] = cls(*key)
+        return variant
+
+    def __repr__(self):
+        return f"Variant({self.size}, {self.win_length})"
+
+    def __reduce__(self):
+        return Variant.get, (self.size, self.win_length)
+
+    @property
+    def name(self):
+        """
+        :return: A short description such as '5x5, four in a row'.
+        """
+        for name, key in VARIANTS.items():
+            if key == (self.size, self.win_length):
+                return name
+        return f"{self.size}x{self.size}, {self.win_length} in a row"
+
+    def is_win(self, mask):
+        """
+        :param mask: The mask of one player's cells.
+        :return: True if the mask contains a complete line.
+        """
+        for line in self.lines:
+            if mask & line == line:
+                return True
+        return False
+
+    def wins_with(self, mask, cell):
+        """
+        Checks only the lines through one cell, which is all that can change when that cell is played.
+
+        :param mask: The mask of one player's cells, including the cell.
+        :param cell: The index of the cell just played.
+        :return: True if the cell completes a line.
+        """
+        for line in self._line_masks_through[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def threats(self, mover, waiting):
+        """
+        Finds the cells where a player completes a line or must block one, in a single pass over the lines.
+
+        A line is a threat when exactly one of its cells is empty and all others belong to the same player.
+
+        :param mover: The mask of the player to move.
+        :param waiting: The mask of the other player.
+        :return: A tuple of the mask of the cells that win for the player to move and the mask of the cells that
+        complete a line of the other player.
+        """
+        occupied = mover | waiting
+        wins = 0
+        blocks = 0
+        for line in self.lines:
+            empty = line & ~occupied
+            if empty and not empty & (empty - 1):
+                if not waiting & line:
+                    wins |= empty
+                elif not mover & line:
+                    blocks |= empty
+        return wins, blocks
+
+    def base3(self, mask):
+        """
+        :param mask: A mask of cells.
+        :return: The sum of 3 ** i over the set cells i.
+        """
+        value = 0
+        power = 1
+        while mask:
+            if mask & 1:
+                value += power
+            mask >>= 1
+            power *= 3
+        return value
+
+
+CLASSIC = Variant.get(3, 3)